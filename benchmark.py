@@ -0,0 +1,208 @@
+"""
+Benchmark of the graph generators, the Graph algorithms and the DOT read/write paths.
+For every generator model and size it times each stage and records its peak memory
+with tracemalloc, and saves the results as JSON so runs can be compared.
+
+    python benchmark.py --max-edges 100000 -o bench.json
+    python benchmark.py -o new.json --compare bench.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from generators import algorithms, utils
+from models.dot import write_dot
+
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6)
+# Mean degree of the random models, so the number of edges decides the number of nodes
+MEAN_DEGREE = 10
+
+
+def _mesh(edges: int):
+    side = max(2, round(math.sqrt(edges / 2)))
+    return algorithms.mesh_random_graph(side, side, save=False)
+
+
+def _erdos(edges: int):
+    return algorithms.erdos_renyi_random_graph(2 * edges // MEAN_DEGREE, edges, save=False)
+
+
+def _gilbert(edges: int):
+    nodes = 2 * edges // MEAN_DEGREE
+    return algorithms.gilbert_random_graph(nodes, MEAN_DEGREE / (nodes - 1), save=False)
+
+
+def _geo(edges: int):
+    nodes = 2 * edges // MEAN_DEGREE
+    # A disk of radius r covers pi * r^2 of the unit square, so a node has about that many neighbors
+    return algorithms.geographical_random_graph(nodes, math.sqrt(MEAN_DEGREE / (math.pi * nodes)), save=False)
+
+
+def _barabasi(edges: int):
+    attached = MEAN_DEGREE // 2
+    return algorithms.barabasi_albert_graph(edges // attached, attached, save=False)
+
+
+def _dorogo(edges: int):
+    # Each new node adds 2 edges to the 3 of the initial triangle
+    return algorithms.dorogovtsev_mendes_graph((edges - 3) // 2, save=False)
+
+
+# Same model names as main.py
+MODELS = {
+    "mesh": _mesh,
+    "erdos": _erdos,
+    "gilbert": _gilbert,
+    "geo": _geo,
+    "barabasi": _barabasi,
+    "dorogo": _dorogo,
+}
+
+
+def _stages(model: str, edges: int, dot_path: str) -> list:
+    """
+    Return the (stage name, function) pairs of one benchmark case, in the order they run.
+    Each function takes the graph built by the generate stage
+    """
+    # First node of the snapshot, which the freeze stage already built and cached
+    source = lambda graph: graph.freeze().name_of(0)
+    return [
+        ("generate", lambda _: MODELS[model](edges)),
+        ("freeze", lambda graph: graph.freeze()),
+        ("bfs", lambda graph: graph.get_bfs_tree(source(graph))),
+        ("dfs", lambda graph: graph.get_dfs_iterative()),
+        ("dijkstra", lambda graph: graph.get_dijkstra(as_color_tree=False, source=source(graph))),
+        ("kruskal", lambda graph: graph.get_MST_by_kruskal_direct()),
+        ("prim", lambda graph: graph.get_mst_by_prim_algorithm()),
+        ("write_dot", lambda graph: write_dot(graph, dot_path, with_weight=True)),
+        ("read_dot", lambda graph: utils.read_graph_from_file(dot_path)),
+    ]
+
+
+def _run_case(model: str, edges: int, seed: int, measure_memory: bool) -> list:
+    """
+    Run the stages of one case and return one record per stage.
+    The case is seeded with its model and size, so it generates the same graph in every run
+    """
+    random.seed(f"{model}-{edges}-{seed}")
+    records = list()
+    graph = None
+    with tempfile.TemporaryDirectory() as folder:
+        for stage, function in _stages(model, edges, os.path.join(folder, "graph.dot")):
+            gc.collect()
+            if measure_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            # The generators and loaders print their progress
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = function(graph)
+            seconds = time.perf_counter() - start
+            peak = None
+            if measure_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            if stage == "generate":
+                graph = result
+            records.append({"model": model, "size": edges, "stage": stage,
+                            "nodes": len(graph.nodes), "edges": len(graph.edges),
+                            "seconds": round(seconds, 6), "peak_bytes": peak})
+            del result
+    return records
+
+
+def run_benchmark(models=tuple(MODELS), sizes=SIZES, seed: int = 0, measure_memory: bool = True) -> dict:
+    """
+    Run every stage for every model and size
+    Args:
+        models (iterable): names of MODELS to run
+        sizes (iterable): target number of edges of the generated graphs
+        seed (int): seed of the random generators
+        measure_memory (bool): record the peak memory of each stage with tracemalloc,
+            in a second run of the case so it does not slow down the timed one
+    Returns:
+        dict: metadata of the run and one record per (model, size, stage)
+    """
+    records = list()
+    for model in models:
+        for edges in sizes:
+            print(f"Benchmarking {model} with {edges} edges")
+            timed = _run_case(model, edges, seed, measure_memory=False)
+            if measure_memory:
+                for record, traced in zip(timed, _run_case(model, edges, seed, measure_memory=True)):
+                    record["peak_bytes"] = traced["peak_bytes"]
+            for record in timed:
+                print(f"  {record['stage']:>10}: {record['seconds']:.4f}s")
+            records.extend(timed)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "seed": seed,
+        "results": records,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 1.25) -> list:
+    """
+    Return the stages that are slower than in a baseline run by more than a ratio
+    Args:
+        current (dict): results of run_benchmark
+        baseline (dict): results of an earlier run_benchmark, as saved in its JSON file
+        threshold (float): ratio of the times above which a stage counts as a regression
+    Returns:
+        list: (model, size, stage, baseline seconds, current seconds) of the regressions
+    """
+    key = lambda record: (record["model"], record["size"], record["stage"])
+    baseline_records = {key(record): record for record in baseline["results"]}
+    regressions = list()
+    for record in current["results"]:
+        previous = baseline_records.get(key(record))
+        # Stages under 10 milliseconds are mostly noise
+        if previous is None or previous["seconds"] < 1e-2:
+            continue
+        if record["seconds"] > previous["seconds"] * threshold:
+            regressions.append((*key(record), previous["seconds"], record["seconds"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the graph generators, algorithms and DOT files")
+    parser.add_argument("--models", type=str, nargs="+", choices=list(MODELS), default=list(MODELS),
+                        help="Generator models to benchmark")
+    parser.add_argument("--max-edges", type=int, default=SIZES[-1], help="Biggest size of the sweep, in edges")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generators")
+    parser.add_argument("--memory", action=argparse.BooleanOptionalAction, default=True,
+                        help="Record the peak memory of each stage with tracemalloc")
+    parser.add_argument("-o", "--output", type=str, default="benchmark.json", help="JSON file for the results")
+    parser.add_argument("--compare", type=str, help="JSON file of an earlier run to detect regressions against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Slowdown ratio reported as a regression by --compare")
+
+    args = parser.parse_args()
+    sizes = [size for size in SIZES if size <= args.max_edges]
+    results = run_benchmark(args.models, sizes, args.seed, args.memory)
+    with open(args.output, "w", encoding="UTF-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved to {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="UTF-8") as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for model, size, stage, before, after in regressions:
+            print(f"Regression in {model} {size} {stage}: {before:.4f}s -> {after:.4f}s")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,11 +11,15 @@ algorithm. The algorithms implemented in this module are:
 - Barabasi-Albert varian graph
 - Dorogovtsev-Mendes graph
 """
+from models.csr import FrozenGraph
+from models.mesh import MeshGraph
+from models.profiling import PROFILER
 from models.graph import Graph, Node, Edge, GeoNode
 from generators import utils
 import random
 
-def mesh_random_graph(m:int, n:int, is_directed: bool=False, graph_name: str="") -> Graph:
+@PROFILER.profiled("generate.mesh")
+def mesh_random_graph(m:int, n:int, is_directed: bool=False, graph_name: str="", save: bool=True) -> Graph:
     """
     Generate a graph with ,m*n nodes and connect n+1 node and 
     m+1 node with an edge in a grid 
@@ -23,6 +27,7 @@ def mesh_random_graph(m:int, n:int, is_directed: bool=False, graph_name: str="")
     :param n: number of rows
     :param is_directed: if the graph is directed
     :param graph_name: name of the graph
+    :param save: save the graph to outputs/ with save_graphviz_by_node
     """
     if m < 1 or n < 1:
         print("m and n must be bigger than 1")
@@ -37,154 +42,189 @@ def mesh_random_graph(m:int, n:int, is_directed: bool=False, graph_name: str="")
     for column in range(m):
         row_nodes = list()
         for row in range(n):
-            node_name = f"{column + 1}{row + 1}"
+            # Same names as MeshGraph, the separator keeps e.g. column 1 row 11 and column 11 row 1 apart
+            node_name = f"{column + 1}_{row + 1}"
             node = Node(name=node_name)
             row_nodes.append(node)
         list_of_nodes.append(row_nodes)
     # print("List of nodes: ", list_of_nodes)
     # Flatten list of nodes
 
-    for col in range(m):
-        for ix in range(n):
-            if ix + 1 < n:
-                graph.add_edge(list_of_nodes[col][ix], list_of_nodes[col][ix + 1])
-            if col + 1 < m:
-                graph.add_edge(list_of_nodes[col][ix],list_of_nodes[col + 1][ix])
-
-    # print("List of edges: ", list_of_edges)
-    list_of_nodes = [node for row in list_of_nodes for node in row]
-    graph.nodes = list_of_nodes
-
-    graph.save_graphviz_by_node()
+    def grid_edges():
+        for col in range(m):
+            for ix in range(n):
+                if ix + 1 < n:
+                    yield list_of_nodes[col][ix], list_of_nodes[col][ix + 1]
+                if col + 1 < m:
+                    yield list_of_nodes[col][ix], list_of_nodes[col + 1][ix]
+    graph.add_edges(grid_edges())
+
+    # Add the nodes without edges too (1x1 meshes), keeping the node index in sync
+    for row_nodes in list_of_nodes:
+        for node in row_nodes:
+            graph.add_node(node)
+
+    if save:
+        graph.save_graphviz_by_node()
     return graph
 
-def erdos_renyi_random_graph(n:int, m:int, is_directed: bool=False, graph_name: str="") -> Graph:
+@PROFILER.profiled("generate.mesh_implicit")
+def mesh_implicit_graph(m:int, n:int, is_directed: bool=False, graph_name: str="", max_weight: int=1) -> MeshGraph:
+    """
+    Generate a mesh of m*n nodes that computes its neighbors on demand instead of
+    storing Node and Edge objects, for grids too large for mesh_random_graph.
+    Nodes are named N_<column>_<row>. Use its freeze method to get a FrozenGraph,
+    or its to_graph method to get a regular Graph
+    :param m: number of columns
+    :param n: number of rows
+    :param is_directed: if the graph is directed
+    :param graph_name: name of the graph
+    :param max_weight: if bigger than 1, edges get a pseudo random weight between 1 and max_weight
+    """
+    return MeshGraph(m, n, is_directed=is_directed, name=graph_name, max_weight=max_weight,
+                     seed=random.randrange(2 ** 32))
+
+@PROFILER.profiled("generate.erdos_renyi")
+def erdos_renyi_random_graph(n:int, m:int, is_directed: bool=False, graph_name: str="", save: bool=True) -> Graph:
     """
-    Generate a graph with n nodes and try m times 
-    to create an edge between two nodes using the Erdos-Renyi model
+    Generate a graph with n nodes and exactly m edges chosen uniformly
+    among all the pairs of nodes (Erdos-Renyi G(n, m) model).
+    The pairs are sampled by number from the pair space (see utils.erdos_renyi_pairs)
+    and added in bulk
     :param n: number of nodes
-    :param m: number of tries to create an edge
+    :param m: number of edges, at most n(n-1)/2 (n(n-1) if directed)
     :param is_directed: if the graph is directed
     :param graph_name: name of the graph
+    :param save: save the graph to outputs/ with save_graphviz_by_node
     """
-    # list_of_nodes = list()
     if graph_name == "":
         graph_name = f"Erdos_{m}x{n}"
     graph = Graph(is_directed=is_directed, name=graph_name)
     
-    for i in range(n):
-        graph.add_node(Node(name=str(i)))
-    print(graph.get_nodes())
-    # list_of_edges = list()
-    
-    while len(graph.edges) < m:
-        # Selesct a random sample of two nodes from the set of nodes
-        selected_nodes = random.sample(list(graph.nodes), 2)
-        print(selected_nodes)
-        if selected_nodes[0] != selected_nodes[1]:
-            graph.add_edge(selected_nodes[0], selected_nodes[1])
+    nodes = [graph.add_node(Node(name=str(i))) for i in range(n)]
+    graph.add_edges((nodes[i], nodes[j]) for i, j in utils.erdos_renyi_pairs(n, m, is_directed))
 
-    graph.save_graphviz_by_node()
+    if save:
+        graph.save_graphviz_by_node()
 
     return graph
 
-def gilbert_random_graph(n:int, p:float, is_directed: bool=False, graph_name: str="") -> Graph:
+@PROFILER.profiled("generate.gilbert")
+def gilbert_random_graph(n:int, p:float, is_directed: bool=False, graph_name: str="", save: bool=True) -> Graph:
     """
-    Generate a graph with n nodes and try m times 
-    to create an edge between two nodes
+    Generate a graph with n nodes where each pair of nodes
+    gets an edge with probability p (Gilbert G(n, p) model).
+    The edges are sampled with geometric skipping (see utils.gilbert_pairs),
+    so the cost grows with the number of edges, not with n^2
     :param n: number of nodes
     :param p: probability of creating an edge
+    :param is_directed: if the graph is directed, each ordered pair is sampled
+    :param graph_name: name of the graph
+    :param save: save the graph to outputs/ with save_graphviz_by_node
     """
     if graph_name == "":
         graph_name = f"Gilbert_{n}_{int(p*100)}"
     graph = Graph(is_directed=is_directed, name=graph_name)
 
-    for i in range(n):
-        graph.add_node(Node(name=str(i)))
-        
-    for i in range(n):
-        for j in range(n):
-            if random.random() < p and i != j:
-                graph.add_edge(graph.nodes[i], graph.nodes[j])
-                
-    graph.save_graphviz_by_node()
+    nodes = [graph.add_node(Node(name=str(i))) for i in range(n)]
+    graph.add_edges((nodes[i], nodes[j]) for i, j in utils.gilbert_pairs(n, p, is_directed))
+
+    if save:
+        graph.save_graphviz_by_node()
     return graph
 
 
-def geographical_random_graph(n:int, r:float, is_directed: bool=False, graph_name: str="") -> Graph:
+@PROFILER.profiled("generate.geographical")
+def geographical_random_graph(n:int, r:float, is_directed: bool=False, graph_name: str="", save: bool=True) -> Graph:
     """
-    Generate a graph with n nodes and connect two nodes if they are closer than r
+    Generate a graph with n nodes in random positions of the unit square
+    and connect two nodes if they are closer than r.
+    Only the nodes in neighbor cells of side r are compared (see utils.close_pairs),
+    so sparse graphs with small r are generated in about O(n + edges)
+    :param n: number of nodes
+    :param r: maximum distance between connected nodes
+    :param is_directed: if the graph is directed, close nodes get an edge in each direction
+    :param graph_name: name of the graph
+    :param save: save the graph to outputs/ with save_graphviz_by_node
     """
     if graph_name == "":
         graph_name = f"Geographical_{n}_{int(r*100)}"
         
     graph = Graph(is_directed=is_directed, name=graph_name)
-    for i in range(n):
-        graph.add_node(GeoNode(name=str(i), x_coord=random.random(), y_coord=random.random()))
-
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                distance = graph.nodes[i].calculate_distance(graph.nodes[j])
-                if distance < r:
-                    graph.add_edge(graph.nodes[i], graph.nodes[j])
-                    
-    graph.save_graphviz_by_node()
+    x_coords = [random.random() for _ in range(n)]
+    y_coords = [random.random() for _ in range(n)]
+    nodes = [graph.add_node(GeoNode(name=str(i), x_coord=x_coords[i], y_coord=y_coords[i])) for i in range(n)]
+
+    def close_edges():
+        for i, j in utils.close_pairs(x_coords, y_coords, r):
+            yield nodes[i], nodes[j]
+            if is_directed:
+                yield nodes[j], nodes[i]
+    graph.add_edges(close_edges())
+
+    if save:
+        graph.save_graphviz_by_node()
     return graph
 
-def barabasi_albert_graph(n:int, d:int, is_directed: bool=False, graph_name: str="") -> Graph:
+@PROFILER.profiled("generate.barabasi_albert")
+def barabasi_albert_graph(n:int, d:int, is_directed: bool=False, graph_name: str="", save: bool=True) -> Graph:
     """
-    Generate a graph with n nodes and m edges
+    Generate a graph with n nodes by preferential attachment (Barabasi-Albert model).
+    It starts with a complete graph of 5 nodes (d + 1 if d is bigger) and each
+    new node is linked to d different nodes, chosen with probability proportional
+    to their degree (see utils.barabasi_albert_pairs)
+    :param n: number of nodes
+    :param d: number of edges from each new node
+    :param is_directed: if the graph is directed, edges go from the new node to the chosen ones
+    :param graph_name: name of the graph
+    :param save: save the graph to outputs/ with save_graphviz_by_node
     """
     if graph_name == "":
         graph_name = f"Barabasi-Albert_{n}_{d}"
     graph = Graph(is_directed=is_directed, name=graph_name)
 
-    # Create initial graph with 5 nodes
-    initial_nodes = list()
-    for i in range(5):
-        initial_nodes.append(Node(name=str(i)))
-        
-    for i in range(5):
-        for j in range(5):
-            if i != j:
-                graph.add_edge(initial_nodes[i], initial_nodes[j])
-    
-    while len(graph.nodes) < n:
-        new_node = Node(name=str(i + 5))
-        current_nodes = graph.nodes.copy()
-        for existent_node in current_nodes:
-                # d is the max grade of the node and the chances of connecting to the node
-                # is proportional to the grade of the node
-                if existent_node.get_degree() < d and random.random() < existent_node.get_degree() / sum([node.get_degree() for node in current_nodes]):
-                    graph.add_edge(new_node, existent_node)
-        i += 1
-    graph.save_graphviz_by_node()
+    nodes = [graph.add_node(Node(name=str(i))) for i in range(n)]
+    graph.add_edges((nodes[i], nodes[j]) for i, j in utils.barabasi_albert_pairs(n, d))
+    if save:
+        graph.save_graphviz_by_node()
     return graph
     
     
-def dorogovtsev_mendes_graph(n:int, is_directed: bool=False, graph_name: str="") -> Graph:
+@PROFILER.profiled("generate.dorogovtsev_mendes")
+def dorogovtsev_mendes_graph(n:int, is_directed: bool=False, graph_name: str="", save: bool=True) -> Graph:
     """
-    Generate a graph with n nodes
+    Generate a Dorogovtsev-Mendes graph: start with a triangle and add n nodes,
+    each one linked to both nodes of a random edge (see utils.dorogovtsev_mendes_edges)
+    :param n: number of nodes added to the initial triangle
+    :param is_directed: if the graph is directed, edges go from the new node
+    :param graph_name: name of the graph
+    :param save: save the graph to outputs/ with save_graphviz_by_node
     """
     if graph_name == "":
         graph_name = f"Dorogovtsev-Mendes_{n}"
         
     graph = Graph(is_directed=is_directed, name=graph_name)
-   # Generate start 3 nodes and edges:
-    for i in range(3):
-        graph.add_node(Node(name=str(i)))
-
-    graph.add_edge(graph.nodes[0], graph.nodes[1])
-    graph.add_edge(graph.nodes[1], graph.nodes[2])
-    graph.add_edge(graph.nodes[2], graph.nodes[0])
-
-    for i in range(3, 3+n):
-        new_node = Node(name=str(i))
-        selected_edge = random.choice(graph.edges)
-        graph.add_edge(new_node, selected_edge.node_from)
-        graph.add_edge(new_node, selected_edge.node_to)
-        graph.add_node(new_node)
+    nodes = [graph.add_node(Node(name=str(i))) for i in range(3 + n)]
+    sources, targets = utils.dorogovtsev_mendes_edges(n)
+    graph.add_edges((nodes[source], nodes[target]) for source, target in zip(sources, targets))
         
-    graph.save_graphviz_by_node()
+    if save:
+        graph.save_graphviz_by_node()
     return graph
+
+
+@PROFILER.profiled("generate.dorogovtsev_mendes_frozen")
+def dorogovtsev_mendes_frozen_graph(n:int, is_directed: bool=False, graph_name: str="") -> FrozenGraph:
+    """
+    Generate a Dorogovtsev-Mendes graph straight into a CSR snapshot, without
+    Node and Edge objects, for multi-million node instances.
+    Nodes are named N_0, N_1... as in dorogovtsev_mendes_graph
+    :param n: number of nodes added to the initial triangle
+    :param is_directed: if the graph is directed, edges go from the new node
+    :param graph_name: name of the graph
+    """
+    if graph_name == "":
+        graph_name = f"Dorogovtsev-Mendes_{n}"
+    sources, targets = utils.dorogovtsev_mendes_edges(n)
+    names = [f"N_{i}" for i in range(3 + n)]
+    return FrozenGraph.from_edge_arrays(names, sources, targets, is_directed=is_directed, name=graph_name)
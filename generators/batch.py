@@ -0,0 +1,243 @@
+"""
+Batch runner of graph algorithms over many graphs in a pool of processes.
+The graphs are written once to a temporary archive (see models.archive) that every
+worker maps, each (graph, algorithm) job sends back its summary and the resulting
+tree as archive bytes, and only the parent process writes to the outputs folder.
+"""
+import csv
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+from models import mst
+from models.archive import archive_bytes, open_archive, write_archive
+from models.csr import DFS_RECURSIVE, DFS_STACK, FrozenGraph
+from models.dot import write_dot
+
+DEFAULT_ALGORITHMS = ("bfs", "dfs", "dijkstra", "kruskal", "prim")
+
+
+def _source(graph: FrozenGraph) -> int:
+    # Same default as Graph.get_bfs_tree: N_0, or the first node if there is no N_0
+    try:
+        return graph.index_of("N_0")
+    except KeyError:
+        return 0
+
+
+def _tree_edges(graph: FrozenGraph, parent) -> list:
+    names = graph.names
+    return [(names[parent_id], names[node_id], 1) for node_id, parent_id in enumerate(parent) if parent_id >= 0]
+
+
+def _run_bfs(graph: FrozenGraph) -> tuple:
+    result = graph.bfs(_source(graph))
+    summary = {"reached": len(result.order()), "depth": len(result.levels) - 1}
+    return f"BFS_{graph.name}", _tree_edges(graph, result.parent), summary
+
+
+def _run_dfs(graph: FrozenGraph, order: str, prefix: str) -> tuple:
+    result = graph.dfs(_source(graph), order)
+    return f"{prefix}_{graph.name}", _tree_edges(graph, result.parent), {"reached": len(result.preorder)}
+
+
+def _run_dijkstra(graph: FrozenGraph) -> tuple:
+    result = graph.shortest_paths(_source(graph))
+    distances = result.distances()
+    summary = {"reached": len(distances), "max_distance": max(distances.values(), default=0)}
+    return f"Dijkstra_{graph.name}", list(result.tree_edges()), summary
+
+
+def _run_mst(graph: FrozenGraph, algorithm) -> tuple:
+    result = algorithm(graph)
+    summary = {"total_weight": result.total_weight, "num_components": result.num_components}
+    return result.name, result.edges, summary
+
+
+# Algorithm name -> (function from a FrozenGraph to (tree name, tree edges, summary), outputs subfolder)
+ALGORITHMS = {
+    "bfs": (_run_bfs, "bfs"),
+    "dfs": (lambda graph: _run_dfs(graph, DFS_RECURSIVE, "DFS_R"), "dfs_r"),
+    "dfs_i": (lambda graph: _run_dfs(graph, DFS_STACK, "DFS_I"), "dfs_i"),
+    "dijkstra": (_run_dijkstra, "dijkstra"),
+    "kruskal": (lambda graph: _run_mst(graph, lambda frozen: mst.kruskal(frozen, name=f"MST_Kruskal_{frozen.name}")),
+                "mst_kruskal"),
+    "kruskal_inverse": (lambda graph: _run_mst(graph, lambda frozen: mst.reverse_delete(
+        frozen, name=f"MST_Kruskal_Inverse{frozen.name}")), "mst_kruskal_inverse"),
+    "prim": (lambda graph: _run_mst(graph, lambda frozen: mst.prim_eager(frozen, name=f"MST_Prim_{frozen.name}")),
+             "mst_prim"),
+}
+
+
+def tree_snapshot(name: str, edges: list, is_directed: bool = False) -> FrozenGraph:
+    """
+    Build a FrozenGraph from a list of (node name, node name, weight) edges
+    """
+    ids = dict()
+    sources, targets, weights = [], [], []
+    for from_name, to_name, weight in edges:
+        sources.append(ids.setdefault(from_name, len(ids)))
+        targets.append(ids.setdefault(to_name, len(ids)))
+        weights.append(weight)
+    return FrozenGraph.from_edge_arrays(list(ids), sources, targets, weights, is_directed=is_directed, name=name)
+
+
+# Archive opened by each worker process in _open_worker_archive
+_worker_archive = None
+
+
+def _open_worker_archive(archive_path: str) -> None:
+    global _worker_archive
+    _worker_archive = open_archive(archive_path)
+
+
+def run_job(graph_name: str, algorithm: str, keep_tree: bool, archive=None) -> dict:
+    """
+    Run one algorithm on one graph of the archive, in a worker process or in this one.
+    Empty graphs are skipped, and a failing algorithm is recorded instead of raised,
+    so one job does not stop the rest of the batch
+    Returns:
+        dict: summary of the job, with the tree as archive bytes under 'tree' if keep_tree,
+            'skipped' for empty graphs and 'error' for failed jobs
+    """
+    graph = (archive if archive is not None else _worker_archive)[graph_name]
+    record = {"graph": graph_name, "algorithm": algorithm, "nodes": graph.num_nodes, "edges": graph.num_edges}
+    if not graph.num_nodes:
+        record["skipped"] = "empty graph"
+        return record
+    function, _ = ALGORITHMS[algorithm]
+    start = time.perf_counter()
+    try:
+        tree_name, edges, summary = function(graph)
+    except Exception as error:
+        record["error"] = f"{type(error).__name__}: {error}"
+        return record
+    record.update({"seconds": round(time.perf_counter() - start, 6), "tree_edges": len(edges), **summary})
+    if keep_tree:
+        record["tree"] = archive_bytes([tree_snapshot(tree_name, edges)])
+    return record
+
+
+def _job_result(future, graph_name: str, algorithm: str) -> dict:
+    """
+    Return the record of a job run in the pool, or an error record if the worker failed
+    """
+    try:
+        return future.result()
+    except Exception as error:
+        return {"graph": graph_name, "algorithm": algorithm, "error": f"{type(error).__name__}: {error}"}
+
+
+def _write_tree(record: dict, output_folder: str) -> str:
+    """
+    Write the tree of a job as a DOT file in the subfolder of its algorithm. Runs in the writer thread
+    """
+    tree_archive = open_archive(record.pop("tree"))
+    tree = tree_archive[tree_archive.names[0]]
+    folder = os.path.join(output_folder, ALGORITHMS[record["algorithm"]][1])
+    os.makedirs(folder, exist_ok=True)
+    current_datetime_code = datetime.now().strftime("%Y%m%d%H%M")
+    file_path = os.path.join(folder, f"graph_{tree.name}_{current_datetime_code}.dot")
+    write_dot(tree, file_path, with_weight=True)
+    return file_path
+
+
+def run_batch(graphs,
+              algorithms=DEFAULT_ALGORITHMS,
+              workers: int = None,
+              output_folder: str = None,
+              manifest_path: str = None) -> list:
+    """
+    Run every algorithm on every graph, the (graph, algorithm) jobs spread over a pool of processes
+    Args:
+        graphs (iterable): Graph, FrozenGraph or MeshGraph objects, with different names
+        algorithms (iterable): names of ALGORITHMS to run, bfs, dfs, dijkstra, kruskal and prim by default
+        workers (int): number of processes, os.cpu_count() by default. 1 runs the jobs in this process
+        output_folder (str): folder to save the resulting trees to, in its bfs/, dfs_r/, mst_prim/...
+            subfolders. Nothing is saved if None
+        manifest_path (str): file to save the summaries to, as JSON or as CSV if it ends in .csv
+    Returns:
+        list: one summary dict per job, in the order of the graphs and the algorithms.
+            Failed jobs have an 'error' entry and jobs on empty graphs a 'skipped' one
+
+    Examples:
+
+        >>> graphs = local_generator.generate_graph_for_all_files_and_add_weight()
+        >>> run_batch(graphs, output_folder="outputs", manifest_path="outputs/manifest.json")
+    """
+    algorithms = list(algorithms)
+    unknown = [algorithm for algorithm in algorithms if algorithm not in ALGORITHMS]
+    if unknown:
+        raise ValueError(f"Unknown algorithms {unknown}, expected some of {list(ALGORITHMS)}")
+    keep_tree = output_folder is not None
+    workers = workers or os.cpu_count() or 1
+    file_descriptor, archive_path = tempfile.mkstemp(suffix=".glar")
+    os.close(file_descriptor)
+    try:
+        write_archive(archive_path, graphs)
+        archive = open_archive(archive_path)
+        jobs = [(graph_name, algorithm) for graph_name in archive.names for algorithm in algorithms]
+        # A single writer thread saves the trees while the next results are collected
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            if workers == 1:
+                records = (run_job(graph_name, algorithm, keep_tree, archive) for graph_name, algorithm in jobs)
+                writes = _collect(records, writer, output_folder)
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_open_worker_archive,
+                                         initargs=(archive_path,)) as executor:
+                    futures = [executor.submit(run_job, graph_name, algorithm, keep_tree)
+                               for graph_name, algorithm in jobs]
+                    records = (_job_result(future, graph_name, algorithm)
+                               for future, (graph_name, algorithm) in zip(futures, jobs))
+                    writes = _collect(records, writer, output_folder)
+            results = [record for record, _ in writes]
+            for record, write in writes:
+                if write is None:
+                    continue
+                try:
+                    record["output"] = write.result()
+                except Exception as error:
+                    record["error"] = f"{type(error).__name__}: {error}"
+        archive.close()
+    finally:
+        os.remove(archive_path)
+    if manifest_path is not None:
+        write_manifest(results, manifest_path)
+    return results
+
+
+def _collect(records, writer: ThreadPoolExecutor, output_folder: str) -> list:
+    writes = list()
+    for record in records:
+        write = None
+        if "error" in record:
+            print(f"{record['algorithm']} on {record['graph']} failed: {record['error']}")
+        elif "skipped" in record:
+            print(f"{record['algorithm']} on {record['graph']} skipped: {record['skipped']}")
+        else:
+            if output_folder is not None:
+                write = writer.submit(_write_tree, record, output_folder)
+            print(f"{record['algorithm']} on {record['graph']}: {record['seconds']}s")
+        writes.append((record, write))
+    return writes
+
+
+def write_manifest(results: list, manifest_path: str) -> None:
+    """
+    Save the summaries of run_batch as a JSON list, or as a CSV table if the path ends in .csv
+    """
+    if manifest_path.endswith(".csv"):
+        columns = list()
+        for record in results:
+            columns.extend(key for key in record if key not in columns)
+        with open(manifest_path, "w", encoding="UTF-8", newline="") as file:
+            table = csv.DictWriter(file, fieldnames=columns)
+            table.writeheader()
+            table.writerows(results)
+    else:
+        with open(manifest_path, "w", encoding="UTF-8") as file:
+            json.dump(results, file, indent=2)
+    print(f"Manifest saved to {manifest_path} ")
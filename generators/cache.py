@@ -0,0 +1,190 @@
+"""
+Persistent cache of parsed .dot files. Each parsed file is stored as the bytes of a
+one graph archive (see models.archive), so an unchanged corpus loads without parsing it.
+"""
+import hashlib
+import json
+import os
+import time
+
+from generators import utils
+
+# Version of the layout of the cache, entries of other versions are dropped
+CACHE_VERSION = 1
+DEFAULT_CACHE_FOLDER = os.path.join(".cache", "graphs")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ParseCache:
+    """
+    Folder with the parsed form of .dot files and an index.json that maps
+    every file to its entry, with the size, mtime and content hash it had when it was parsed.
+    A file whose size and mtime did not change is a hit without reading it; if they changed
+    its content is hashed, so a touched but unchanged file is still a hit.
+    Entries are named by the hash of the content and the graph name, and the least
+    recently used ones are removed when the entries take more than max_bytes, checked
+    when the cache is opened, on every put and when the index is saved
+
+    - Attributes:
+        - folder (str): folder of the cache
+        - max_bytes (int): size limit of the entries
+        - hits (int): lookups answered by the cache since it was opened
+        - misses (int): lookups that had to be parsed
+
+    - Examples:
+
+        >>> with ParseCache() as cache:
+        ...     graphs = list(load_corpus("outputs", cache=cache))
+    """
+
+    def __init__(self, folder: str = DEFAULT_CACHE_FOLDER, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(folder, exist_ok=True)
+        self._index_path = os.path.join(folder, "index.json")
+        self._files, self._entries = self._read_index()
+        # Hashes computed by get() for the misses, so put() does not read the file again
+        self._pending = dict()
+        self._dirty = False
+        # The cache may have been filled with a bigger limit
+        self.evict()
+
+    def _read_index(self) -> tuple:
+        try:
+            with open(self._index_path, "r", encoding="UTF-8") as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return dict(), dict()
+        if index.get("version") != CACHE_VERSION:
+            return dict(), dict()
+        return index["files"], index["entries"]
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.folder, f"{key}.glar")
+
+    def _content_key(self, file_path: str) -> str:
+        hasher = hashlib.blake2b(digest_size=20)
+        # The archive stores the graph name, which comes from the file name
+        hasher.update(utils.graph_name_from_file(file_path).encode("UTF-8") + b"\0")
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def _touch(self, key: str) -> None:
+        self._entries[key]["last_used"] = time.time()
+        self._dirty = True
+
+    def get(self, file_path: str) -> bytes:
+        """
+        Return the cached archive bytes of a file, or None if it has to be parsed
+        Args:
+            file_path (str): path of the .dot file
+        Returns:
+            bytes: archive with the graph of the file, as written by corpus.parse_to_archive
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        record = self._files.get(path)
+        if record is None or record["size"] != stat.st_size or record["mtime_ns"] != stat.st_mtime_ns:
+            key = self._content_key(path)
+            record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "key": key}
+            if key not in self._entries:
+                self._pending[path] = record
+                self.misses += 1
+                return None
+            self._files[path] = record
+        key = record["key"]
+        try:
+            with open(self._entry_path(key), "rb") as file:
+                data = file.read()
+        except OSError:
+            # Removed by hand or by another process, parse the file again
+            self._entries.pop(key, None)
+            self._files.pop(path, None)
+            self._pending[path] = record
+            self.misses += 1
+            return None
+        self._touch(key)
+        self.hits += 1
+        return data
+
+    def put(self, file_path: str, data: bytes) -> None:
+        """
+        Store the archive bytes of a parsed file, evicting old entries if needed
+        """
+        path = os.path.abspath(file_path)
+        record = self._pending.pop(path, None)
+        if record is None:
+            stat = os.stat(path)
+            record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "key": self._content_key(path)}
+        key = record["key"]
+        entry_path = self._entry_path(key)
+        temporary_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, entry_path)
+        self._entries[key] = {"bytes": len(data), "last_used": time.time()}
+        self._files[path] = record
+        self._dirty = True
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used entries until they take at most max_bytes
+        Returns:
+            int: number of entries removed
+        """
+        total = sum(entry["bytes"] for entry in self._entries.values())
+        if total <= self.max_bytes:
+            return 0
+        removed = set()
+        for key in sorted(self._entries, key=lambda key: self._entries[key]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._entries.pop(key)["bytes"]
+            removed.add(key)
+            try:
+                os.remove(self._entry_path(key))
+            except FileNotFoundError:
+                pass
+        self._files = {path: record for path, record in self._files.items() if record["key"] not in removed}
+        self._dirty = True
+        return len(removed)
+
+    def clear(self) -> None:
+        """
+        Remove every entry of the cache
+        """
+        for key in self._entries:
+            try:
+                os.remove(self._entry_path(key))
+            except FileNotFoundError:
+                pass
+        self._files, self._entries = dict(), dict()
+        self._dirty = True
+        self.save()
+
+    def save(self) -> None:
+        """
+        Write the index to disk, if it changed, after enforcing max_bytes
+        """
+        self.evict()
+        if not self._dirty:
+            return
+        temporary_path = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="UTF-8") as file:
+            json.dump({"version": CACHE_VERSION, "files": self._files, "entries": self._entries}, file)
+        os.replace(temporary_path, self._index_path)
+        self._dirty = False
+
+    def __enter__(self) -> 'ParseCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.save()
+
+    def __repr__(self) -> str:
+        return f"ParseCache({self.folder}, entries={len(self._entries)}, hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,124 @@
+"""
+Parallel loader of the .dot files of a folder and its subfolders.
+Files are parsed in a pool of processes, and every parsed graph comes back
+as the bytes of a one graph archive (see models.archive), so the parent
+process receives a few flat arrays instead of unpickling Node and Edge objects.
+"""
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+from generators import utils
+from generators.cache import ParseCache
+from models.archive import archive_bytes, open_archive
+
+
+def discover_dot_files(folder: str = "outputs") -> list:
+    """
+    Return the paths of all the .dot files in a folder and its subfolders, sorted
+    Args:
+        folder (str): folder to search, default to 'outputs'
+    Returns:
+        list: paths of the files, starting with the folder
+    """
+    return [os.path.join(folder, file) for file in utils.get_files_in_folder(folder, recursive=True)]
+
+
+def parse_to_archive(file_path: str, add_random_weigth: bool = False) -> bytes:
+    """
+    Parse a .dot file into the bytes of an archive with its graph. Runs in the worker processes
+    """
+    return archive_bytes([utils.read_dot_edges(file_path, add_random_weigth).freeze()])
+
+
+def _load_archive(data: bytes, as_graph: bool):
+    """
+    Return the graph of a one graph archive, as a Graph or as a FrozenGraph over the bytes
+    """
+    archive = open_archive(data)
+    frozen = archive[archive.names[0]]
+    return frozen.to_graph() if as_graph else frozen
+
+
+def load_corpus(folder: str = "outputs",
+                files: list = None,
+                add_random_weigth: bool = False,
+                as_graph: bool = True,
+                ordered: bool = False,
+                workers: int = None,
+                max_in_flight: int = None,
+                cache: ParseCache = None):
+    """
+    Parse .dot files in parallel and yield their graphs as they are ready
+    Args:
+        folder (str): folder to search recursively, default to 'outputs'
+        files (list): paths of the files to parse, instead of searching the folder
+        add_random_weigth (bool): replace the weights by random weights between 1 and 100
+        as_graph (bool): yield Graph objects, or FrozenGraph snapshots if False
+        ordered (bool): yield the files in sorted path order instead of as they finish
+        workers (int): number of processes, os.cpu_count() by default. 1 parses in this process
+        max_in_flight (int): files parsed or waiting to be collected at the same time,
+            2 per worker by default. It bounds the memory used by finished results
+        cache (ParseCache): cache to read the unchanged files from and to store the parsed ones.
+            Not used with add_random_weigth, whose weights change on every load
+    Yields:
+        tuple: (path of the file, graph)
+
+    Examples:
+
+        >>> for file_path, graph in load_corpus("outputs", ordered=True):
+        ...     print(file_path, len(graph.edges))
+    """
+    files = discover_dot_files(folder) if files is None else sorted(files)
+    if add_random_weigth:
+        cache = None
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for file_path in files:
+            data = cache.get(file_path) if cache is not None else None
+            if data is None:
+                data = parse_to_archive(file_path, add_random_weigth)
+                if cache is not None:
+                    cache.put(file_path, data)
+            yield file_path, _load_archive(data, as_graph)
+        return
+    max_in_flight = max_in_flight or 2 * workers
+    pending_files = iter(files)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit_next() -> bool:
+            file_path = next(pending_files, None)
+            if file_path is None:
+                return False
+            data = cache.get(file_path) if cache is not None else None
+            if data is None:
+                future = executor.submit(parse_to_archive, file_path, add_random_weigth)
+                parsed.add(future)
+            else:
+                # Hits are finished futures, so both orders handle them as the parsed files
+                future = Future()
+                future.set_result(data)
+            in_flight[future] = file_path
+            if ordered:
+                queue.append(future)
+            return True
+
+        in_flight = dict()
+        parsed = set()
+        # Futures in submission order, which is the sorted order of the files
+        queue = deque()
+        while len(in_flight) < max_in_flight and submit_next():
+            pass
+        while in_flight:
+            if ordered:
+                done = (queue.popleft(),)
+            else:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = in_flight.pop(future)
+                data = future.result()
+                if future in parsed:
+                    parsed.discard(future)
+                    if cache is not None:
+                        cache.put(file_path, data)
+                yield file_path, _load_archive(data, as_graph)
+                submit_next()
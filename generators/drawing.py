@@ -0,0 +1,340 @@
+"""
+Headless force-directed layout of graphs.
+Edges pull their nodes together like springs, every pair of nodes pushes apart,
+and the repulsion is approximated with a Barnes-Hut quadtree: groups of nodes far
+enough from a node act on it as one body in their center of mass, so an iteration
+takes O(n log n) instead of O(n^2).
+"""
+import math
+import random
+from array import array
+
+from models.profiling import PROFILER
+
+# Cooling schedules of ForceLayout
+COOLING_ADAPTIVE = "adaptive"
+COOLING_EXPONENTIAL = "exponential"
+# Quadtree cells with up to this many nodes are not split, their nodes are compared one by one
+LEAF_SIZE = 8
+
+
+class QuadTree:
+    """
+    Barnes-Hut quadtree over a set of points, stored in flat lists indexed by cell id.
+    Cell 0 is the root, a square that contains every point
+
+    - Attributes:
+        - size (list): side of each cell
+        - mass (list): number of points in each cell
+        - center_x, center_y (list): center of mass of each cell
+        - children (list): ids of the non empty subcells of each cell, empty for leaves
+        - bodies (list): ids of the points of each leaf, None for the other cells
+    """
+    __slots__ = ("size", "mass", "center_x", "center_y", "children", "bodies")
+
+    def __init__(self, x, y, min_size: float = 1e-9):
+        self.size, self.mass, self.center_x, self.center_y = [], [], [], []
+        self.children, self.bodies = [], []
+        if not len(x):
+            return
+        left, bottom = min(x), min(y)
+        side = max(max(x) - left, max(y) - bottom, min_size)
+        # Cells waiting to be filled: (cell id, point ids, left, bottom, side)
+        pending = [(self._new_cell(side), list(range(len(x))), left, bottom, side)]
+        while pending:
+            cell, points, left, bottom, side = pending.pop()
+            self.mass[cell] = len(points)
+            self.center_x[cell] = sum([x[point] for point in points]) / len(points)
+            self.center_y[cell] = sum([y[point] for point in points]) / len(points)
+            # Points closer than min_size stay together in one leaf
+            if len(points) <= LEAF_SIZE or side <= min_size:
+                self.bodies[cell] = points
+                continue
+            half = side / 2
+            middle_x, middle_y = left + half, bottom + half
+            lower, upper = [], []
+            for point in points:
+                (lower if y[point] < middle_y else upper).append(point)
+            for quadrant_points, quadrant_bottom in ((lower, bottom), (upper, middle_y)):
+                west, east = [], []
+                for point in quadrant_points:
+                    (west if x[point] < middle_x else east).append(point)
+                for subcell_points, subcell_left in ((west, left), (east, middle_x)):
+                    if subcell_points:
+                        subcell = self._new_cell(half)
+                        self.children[cell].append(subcell)
+                        pending.append((subcell, subcell_points, subcell_left, quadrant_bottom, half))
+
+    def _new_cell(self, side: float) -> int:
+        self.size.append(side)
+        self.mass.append(0)
+        self.center_x.append(0.0)
+        self.center_y.append(0.0)
+        self.children.append([])
+        self.bodies.append(None)
+        return len(self.size) - 1
+
+    def __len__(self) -> int:
+        return len(self.size)
+
+
+class ForceLayout:
+    """
+    Spring-electrical layout (Fruchterman-Reingold forces, Barnes-Hut repulsion).
+    Two nodes at distance d repel with strength * K^2 / d and the ends of an edge
+    attract with d^2 / K, where K is the natural edge length. Each iteration moves every
+    node along its total force by the current step length, which the cooling schedule
+    reduces. A run stops when the mean force is under force_tolerance * K (converged)
+    or when the step length has cooled below tolerance * K (cooled). On big graphs the
+    cooling usually comes first, with some forces still unbalanced.
+    Works on Graph, FrozenGraph and MeshGraph, without pygame
+
+    - Attributes:
+        - graph (IndexedGraph): snapshot of the graph being laid out
+        - x, y (array): position of each node, by integer id of the snapshot
+        - step (float): current step length
+        - iterations (int): iterations run so far
+        - mean_force (float): mean norm of the forces on the nodes in the last iteration
+        - converged (bool): True once mean_force is under force_tolerance * K, the forces balance
+        - cooled (bool): True once the step length is under tolerance * K, the nodes
+          barely move anymore whether the forces balance or not
+
+    - Examples:
+
+        >>> layout = ForceLayout(graph, seed=0)
+        >>> layout.run(max_iterations=300)
+        >>> layout.apply(graph, width=1280, height=720)
+    """
+
+    def __init__(self,
+                 graph,
+                 edge_length: float = 1.0,
+                 strength: float = 0.2,
+                 theta: float = 1.0,
+                 cooling: str = COOLING_ADAPTIVE,
+                 cooling_factor: float = 0.9,
+                 tolerance: float = 0.01,
+                 force_tolerance: float = 0.05,
+                 seed: int = None,
+                 positions: tuple = None):
+        """
+        Args:
+            graph (Graph | IndexedGraph): graph to lay out, Graph and MeshGraph are frozen
+            edge_length (float): natural length K of the edges
+            strength (float): relative strength of the repulsion
+            theta (float): Barnes-Hut opening ratio, a cell of side s at distance d from a
+                leaf of side l acts as one body if (s + l) / d < theta. 0 computes every pair exactly
+            cooling (str): COOLING_ADAPTIVE grows the step while the energy keeps going down
+                and shrinks it when it does not, COOLING_EXPONENTIAL multiplies it by
+                cooling_factor every iteration
+            cooling_factor (float): factor applied to the step when it is reduced
+            tolerance (float): step length, relative to edge_length, below which the layout cooled
+            force_tolerance (float): mean force, relative to edge_length, below which the
+                layout converged. Moves are capped by the step, so forces only settle to
+                about the step length times the stiffness of the springs
+            seed (int): seed of the random initial positions
+            positions (tuple): initial (x, y) sequences, by integer id, instead of random ones
+        """
+        if cooling not in (COOLING_ADAPTIVE, COOLING_EXPONENTIAL):
+            raise ValueError(f"Unknown cooling schedule {cooling}")
+        self.graph = graph if hasattr(graph, "indptr") else graph.freeze()
+        num_nodes = self.graph.num_nodes
+        self.edge_length = edge_length
+        self.strength = strength
+        self.theta = theta
+        self.cooling = cooling
+        self.cooling_factor = cooling_factor
+        self.tolerance = tolerance
+        self.force_tolerance = force_tolerance
+        if positions is None:
+            generator = random.Random(seed)
+            # A square where the nodes are about edge_length apart
+            side = edge_length * math.sqrt(max(num_nodes, 1))
+            self.x = array("d", [generator.random() * side for _ in range(num_nodes)])
+            self.y = array("d", [generator.random() * side for _ in range(num_nodes)])
+        else:
+            self.x, self.y = array("d", positions[0]), array("d", positions[1])
+        self.step = edge_length
+        self.iterations = 0
+        self.mean_force = math.inf
+        self.converged = False
+        self.cooled = False
+        self._energy = math.inf
+        self._progress = 0
+        # Each edge once, so the attraction is applied once per pair of nodes
+        self._sources, self._targets = array("i"), array("i")
+        for source, target, _ in self.graph.edges():
+            if source != target:
+                self._sources.append(source)
+                self._targets.append(target)
+
+    def _repulsion(self, force_x: list, force_y: list) -> None:
+        """
+        Add the repulsion between all the nodes, approximated with a quadtree.
+        The tree is walked once per leaf instead of once per node: the cells far enough
+        from the whole leaf act on each of its nodes as one body, and the nodes of the
+        other cells are compared with them one by one
+        """
+        x, y = self.x, self.y
+        tree = QuadTree(x, y)
+        if not len(tree):
+            return
+        size, mass, center_x, center_y = tree.size, tree.mass, tree.center_x, tree.center_y
+        children, bodies = tree.children, tree.bodies
+        constant = self.strength * self.edge_length * self.edge_length
+        theta_squared = self.theta * self.theta
+        for leaf, members in enumerate(bodies):
+            if members is None:
+                continue
+            leaf_x, leaf_y, leaf_size = center_x[leaf], center_y[leaf], size[leaf]
+            far, near = [], []
+            pending = [0]
+            while pending:
+                cell = pending.pop()
+                dx, dy = leaf_x - center_x[cell], leaf_y - center_y[cell]
+                # The cell has to pass the opening test for every node of the leaf
+                extent = size[cell] + leaf_size
+                if cell != leaf and extent * extent < theta_squared * (dx * dx + dy * dy):
+                    far.append((center_x[cell], center_y[cell], mass[cell]))
+                elif bodies[cell] is not None:
+                    near.extend((other, x[other], y[other]) for other in bodies[cell])
+                else:
+                    pending.extend(children[cell])
+            for node in members:
+                node_x, node_y = x[node], y[node]
+                total_x = total_y = 0.0
+                for cell_x, cell_y, cell_mass in far:
+                    dx, dy = node_x - cell_x, node_y - cell_y
+                    distance_squared = dx * dx + dy * dy
+                    total_x += cell_mass * dx / distance_squared
+                    total_y += cell_mass * dy / distance_squared
+                for other, other_x, other_y in near:
+                    if other == node:
+                        continue
+                    dx, dy = node_x - other_x, node_y - other_y
+                    distance_squared = dx * dx + dy * dy
+                    if distance_squared == 0:
+                        # Overlapping nodes are pushed apart in a direction given by their ids
+                        angle = (node * 2654435761 + other) % 6283 / 1000
+                        dx, dy = math.cos(angle) * 1e-6, math.sin(angle) * 1e-6
+                        distance_squared = 1e-12
+                    total_x += dx / distance_squared
+                    total_y += dy / distance_squared
+                force_x[node] += constant * total_x
+                force_y[node] += constant * total_y
+
+    def _attraction(self, force_x: list, force_y: list) -> None:
+        """
+        Add the spring forces of the edges, d^2 / K towards each other
+        """
+        x, y = self.x, self.y
+        edge_length = self.edge_length
+        for source, target in zip(self._sources, self._targets):
+            dx, dy = x[target] - x[source], y[target] - y[source]
+            # |force| = d^2 / K along the unit vector (dx, dy) / d
+            factor = math.sqrt(dx * dx + dy * dy) / edge_length
+            force_x[source] += dx * factor
+            force_y[source] += dy * factor
+            force_x[target] -= dx * factor
+            force_y[target] -= dy * factor
+
+    def _cool(self, energy: float) -> None:
+        if self.cooling == COOLING_EXPONENTIAL:
+            self.step *= self.cooling_factor
+        elif energy < self._energy:
+            # Adaptive cooling (Hu, 2005): after 5 good iterations in a row, take longer steps
+            self._progress += 1
+            if self._progress >= 5:
+                self._progress = 0
+                self.step /= self.cooling_factor
+        else:
+            self._progress = 0
+            self.step *= self.cooling_factor
+        self._energy = energy
+
+    @PROFILER.profiled("layout.step")
+    def step_once(self) -> float:
+        """
+        Run one iteration, moving every node by at most the step length
+        Returns:
+            float: mean distance moved by the nodes
+        """
+        num_nodes = len(self.x)
+        force_x, force_y = [0.0] * num_nodes, [0.0] * num_nodes
+        self._repulsion(force_x, force_y)
+        self._attraction(force_x, force_y)
+        x, y, step = self.x, self.y, self.step
+        moved = energy = total_force = 0.0
+        for node in range(num_nodes):
+            fx, fy = force_x[node], force_y[node]
+            norm_squared = fx * fx + fy * fy
+            if norm_squared == 0:
+                continue
+            energy += norm_squared
+            norm = math.sqrt(norm_squared)
+            total_force += norm
+            # Every node moves along its force, never more than the step length
+            scale = step / norm if norm > step else 1.0
+            x[node] += fx * scale
+            y[node] += fy * scale
+            moved += norm * scale
+        self._cool(energy)
+        self.iterations += 1
+        self.mean_force = total_force / num_nodes if num_nodes else 0.0
+        self.converged = self.mean_force < self.force_tolerance * self.edge_length
+        self.cooled = self.step < self.tolerance * self.edge_length
+        return moved / num_nodes if num_nodes else 0.0
+
+    def run(self, max_iterations: int = 500, callback=None) -> 'ForceLayout':
+        """
+        Iterate until the layout converges or cools, or max_iterations are run
+        Args:
+            max_iterations (int): limit of iterations of this call
+            callback (callable): called with the layout after each iteration, e.g. to draw it.
+                Returning True stops the run
+        Returns:
+            ForceLayout: the layout itself
+        """
+        for _ in range(max_iterations):
+            self.step_once()
+            if callback is not None and callback(self):
+                break
+            if self.converged or self.cooled:
+                break
+        return self
+
+    def positions(self) -> dict:
+        """
+        Return a dict from node name to its (x, y) position
+        """
+        names = self.graph.names
+        return {names[node]: (self.x[node], self.y[node]) for node in range(len(self.x))}
+
+    def scaled(self, width: float, height: float, margin: float = 20) -> tuple:
+        """
+        Return the positions fitted in a width x height box, keeping the aspect ratio
+        Returns:
+            tuple: (x, y) lists by integer id
+        """
+        if not len(self.x):
+            return [], []
+        left, bottom = min(self.x), min(self.y)
+        span = max(max(self.x) - left, max(self.y) - bottom) or 1.0
+        scale = min(width - 2 * margin, height - 2 * margin) / span
+        return ([margin + (value - left) * scale for value in self.x],
+                [margin + (value - bottom) * scale for value in self.y])
+
+    def apply(self, graph, width: float = None, height: float = None, margin: float = 20) -> None:
+        """
+        Copy the positions to the x_coord and y_coord of the nodes of a Graph,
+        fitted in a width x height box if they are given
+        """
+        if width is None or height is None:
+            x, y = self.x, self.y
+        else:
+            x, y = self.scaled(width, height, margin)
+        for node, name in enumerate(self.graph.names):
+            stored_node = graph.get_node(name)
+            if stored_node is not None:
+                stored_node.x_coord = x[node]
+                stored_node.y_coord = y[node]
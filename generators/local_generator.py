@@ -3,9 +3,16 @@ Module to store already generated outputs and generate a Graph object.
 This generator is used to generate a graph from a file avoiding to generate the 
 random graph again, and enables to validate if the graph/tree is correct.
 """
-import pickle
+import os
+from contextlib import nullcontext
+
+from models.archive import GraphArchive, open_archive, write_archive
 from models.graph import Graph, Node
-from generators import utils
+from generators import batch, corpus, utils
+from generators.cache import ParseCache
+
+# Binary archive with the graphs read from outputs, see models.archive
+GRAPHS_ARCHIVE = "outputs/graphs.glar"
 
 
 def generate_graph_from_one_random_file() -> Graph:
@@ -17,39 +24,56 @@ def generate_graph_from_one_random_file() -> Graph:
     graph = utils.read_graph_from_file(f"outputs/{random_file}")
     pass
 
-def generate_graph_for_all_files_in_folder(dump: bool = False) -> list:
-    list_of_files = utils.get_files_in_folder('outputs')
+def _load_folder(folder: str, recursive: bool, add_random_weigth: bool, workers: int, use_cache: bool) -> list:
+    files = [os.path.join(folder, file) for file in utils.get_files_in_folder(folder, recursive)]
     list_of_graphs = list()
-    for file in list_of_files:
-        graph = utils.read_graph_from_file(f"outputs/{file}")
-        print(f"Graph: {graph.name}")
-        list_of_graphs.append(graph)
-    
-    if dump:
-        pickle.dump(list_of_graphs, open("outputs/graphs.pkl", "wb"))
+    with ParseCache() if use_cache else nullcontext() as cache:
+        for file, graph in corpus.load_corpus(files=files, add_random_weigth=add_random_weigth,
+                                              ordered=True, workers=workers, cache=cache):
+            print(f"Graph: {graph.name}")
+            list_of_graphs.append(graph)
     return list_of_graphs
 
-def generate_graph_for_all_files_and_add_weight() -> list:
-    list_of_files = utils.get_files_in_folder('outputs')
-    list_of_graphs = list()
-    for file in list_of_files:
-        graph = utils.read_graph_from_file(f"outputs/{file}", add_random_weigth=True)
-        print(f"Graph: {graph.name}")
-        list_of_graphs.append(graph)
+def generate_graph_for_all_files_in_folder(dump: bool = False,
+                                           folder: str = "outputs",
+                                           recursive: bool = False,
+                                           workers: int = None,
+                                           use_cache: bool = True) -> list:
+    """
+    Read every .dot file of the folder in a pool of workers. Only the top level by default,
+    recursive also reads the trees that earlier runs saved in the subfolders (bfs/, mst_prim/...).
+    Unchanged files are read from the parse cache (.cache/graphs) instead of parsed again.
+    With dump, the graphs are saved to GRAPHS_ARCHIVE, keeping the first graph of each name
+    """
+    list_of_graphs = _load_folder(folder, recursive, False, workers, use_cache)
+    if dump:
+        unique_graphs = dict()
+        for graph in list_of_graphs:
+            unique_graphs.setdefault(graph.name, graph)
+        write_archive(GRAPHS_ARCHIVE, unique_graphs.values())
     return list_of_graphs
 
-def load_graphs_from_file() -> list:
-    return pickle.load(open("outputs/graphs.pkl", "rb"))
+def generate_graph_for_all_files_and_add_weight(folder: str = "outputs",
+                                                recursive: bool = False,
+                                                workers: int = None) -> list:
+    # Random weights change on every load, so they never come from the cache
+    return _load_folder(folder, recursive, True, workers, use_cache=False)
+
+def load_graphs_from_file(file_path: str = GRAPHS_ARCHIVE) -> GraphArchive:
+    """
+    Open the archive written by generate_graph_for_all_files_in_folder(dump=True).
+    Nothing is read until a graph is asked for by name, as a FrozenGraph:
+    archive[name].to_graph() returns a Graph
+    """
+    return open_archive(file_path)
 
 if __name__ == "__main__":
     # graphs = generate_graph_for_all_files_and_add_weight()
+    # Only the top level, the subfolders hold the trees written by earlier runs
     graphs = generate_graph_for_all_files_in_folder()
     # Sort by graph.name
     graphs.sort(key=lambda x: x.name)
-    names = [graph.name for graph in graphs]
-    for graph in graphs:
-        # print(f"Graph: {graph.name}")
-        print(f"Calculating MST Directed for {graph.name}")
-        kruskal_mst=graph.get_mst_by_prim_algorithm()
-        # kruskal_mst.save_graphviz_with_weigth(is_dijkstra=True)
-    
\ No newline at end of file
+    results = batch.run_batch(graphs, output_folder="outputs", manifest_path="outputs/manifest.json")
+    for result in results:
+        if result["algorithm"] == "prim":
+            print(f"Prim MST value of {result['graph']}: {result['total_weight']}")
@@ -1,9 +1,12 @@
 """"
 utility functions to avoid large class methods
 """
+import math
 import os
 import random
 
+from array import array
+from models.dot import DotEdges, read_dot
 from models.graph import Graph, Node
 from datetime import datetime
 
@@ -18,56 +21,240 @@ def get_distance(node1: Node, node2: Node) -> float:
 
 
 
+def close_pairs(x_coords: list, y_coords: list, radius: float):
+    """
+    Find the pairs of points closer than radius with a cell list: points are put in
+    square cells of side >= radius, so only the points of the same cell and of the
+    neighbor cells need to be compared. Expected O(n + pairs found) for uniform points
+    :param x_coords: x coordinate of each point
+    :param y_coords: y coordinate of each point
+    :param radius: maximum distance (exclusive) between the points of a pair
+    :return: generator of (i, j) index pairs with i < j
+    """
+    if radius <= 0:
+        return
+    cells = dict()
+    for point, (x_coord, y_coord) in enumerate(zip(x_coords, y_coords)):
+        cells.setdefault((int(x_coord // radius), int(y_coord // radius)), []).append(point)
+
+    squared_radius = radius * radius
+    # Half of the neighbor cells, so each pair of cells is compared once
+    half_neighborhood = ((1, -1), (1, 0), (1, 1), (0, 1))
+    for (cell_x, cell_y), points in cells.items():
+        for position, point in enumerate(points):
+            x_coord, y_coord = x_coords[point], y_coords[point]
+            for other in points[position + 1:]:
+                if (x_coord - x_coords[other]) ** 2 + (y_coord - y_coords[other]) ** 2 < squared_radius:
+                    yield (point, other) if point < other else (other, point)
+        for step_x, step_y in half_neighborhood:
+            neighbor_points = cells.get((cell_x + step_x, cell_y + step_y))
+            if not neighbor_points:
+                continue
+            for point in points:
+                x_coord, y_coord = x_coords[point], y_coords[point]
+                for other in neighbor_points:
+                    if (x_coord - x_coords[other]) ** 2 + (y_coord - y_coords[other]) ** 2 < squared_radius:
+                        yield (point, other) if point < other else (other, point)
+
+
+def pair_from_index(index: int, n: int, is_directed: bool = False) -> tuple:
+    """
+    Return the pair of node indexes numbered index in the pair space of a graph with n nodes.
+    Undirected pairs (i, j) with i > j are numbered i(i-1)/2 + j,
+    directed pair number index goes from node index // (n - 1) to the
+    (index % (n - 1))-th of the other nodes
+    :param index: number of the pair, from 0 to n(n-1)/2 - 1 (n(n-1) - 1 if directed)
+    :param n: number of nodes
+    :param is_directed: use the ordered pair space
+    :return: (i, j) tuple of node indexes
+    """
+    if is_directed:
+        i, j = divmod(index, n - 1)
+        return i, (j if j < i else j + 1)
+    i = (1 + math.isqrt(1 + 8 * index)) // 2
+    return i, index - i * (i - 1) // 2
+
+
+def erdos_renyi_pairs(n: int, m: int, is_directed: bool = False) -> list:
+    """
+    Sample m different pairs of nodes uniformly (Erdos-Renyi G(n, m) model), drawing
+    pair numbers from the pair space directly (see pair_from_index).
+    Sparse graphs reject repeated numbers against a set, dense graphs (m over half of
+    the pairs) use Floyd's algorithm so there are no retries. O(m) expected
+    :param n: number of nodes
+    :param m: number of edges
+    :param is_directed: sample ordered pairs
+    :return: list of (i, j) node index pairs
+    """
+    total = n * (n - 1) if is_directed else n * (n - 1) // 2
+    if m < 0 or m > total:
+        raise ValueError(f"m must be between 0 and {total} for {n} nodes")
+    selected = set()
+    if m <= total // 2:
+        # Each batch draws as many numbers as pairs are missing, so it never overshoots
+        while len(selected) < m:
+            selected.update(random.randrange(total) for _ in range(m - len(selected)))
+    else:
+        for candidate in range(total - m, total):
+            pair = random.randrange(candidate + 1)
+            selected.add(candidate if pair in selected else pair)
+    return [pair_from_index(pair, n, is_directed) for pair in selected]
+
+
+def gilbert_pairs(n: int, p: float, is_directed: bool = False):
+    """
+    Sample the edges of a G(n, p) graph with the geometric skipping of Batagelj and Brandes:
+    the gap to the next pair with an edge follows a geometric distribution, so only
+    the pairs that get an edge are generated. Expected O(n + edges)
+    :param n: number of nodes
+    :param p: probability of each pair to get an edge
+    :param is_directed: sample the n(n-1) ordered pairs instead of the n(n-1)/2 unordered ones
+    :return: generator of (i, j) node index pairs, with i > j for undirected graphs
+    """
+    # Checked here and not in the generator, so a wrong p fails before the first pair is asked for
+    if not 0 <= p <= 1:
+        raise ValueError(f"p must be between 0 and 1, got {p}")
+    return _gilbert_pairs(n, p, is_directed)
+
+
+def _gilbert_pairs(n: int, p: float, is_directed: bool):
+    if p == 0 or n < 2:
+        return
+    log_q = math.log(1 - p) if p < 1 else None
+
+    def skip() -> int:
+        if log_q is None:
+            return 0
+        return int(math.log(1 - random.random()) / log_q)
+
+    if is_directed:
+        total = n * (n - 1)
+        pair = skip()
+        while pair < total:
+            yield pair_from_index(pair, n, is_directed=True)
+            pair += 1 + skip()
+        return
+
+    i, j = 1, -1
+    while i < n:
+        j += 1 + skip()
+        while j >= i and i < n:
+            j -= i
+            i += 1
+        if i < n:
+            yield i, j
+
+
+def barabasi_albert_pairs(n: int, d: int, initial_nodes: int = 5):
+    """
+    Sample the edges of a Barabasi-Albert preferential attachment graph.
+    It starts from a complete graph and every new node links to exactly d different
+    existing nodes, chosen with probability proportional to their degree.
+    Every edge writes both of its nodes to an endpoints array, so a node appears
+    there once per unit of degree and a uniform pick from the array is a degree
+    weighted pick. O(n * d) expected
+    :param n: number of nodes
+    :param d: number of edges added with each new node
+    :param initial_nodes: nodes of the initial complete graph, raised to d + 1 if smaller
+    :return: generator of (i, j) node index pairs, i is the new node for the attachment edges
+    """
+    initial_nodes = min(n, max(initial_nodes, d + 1))
+    endpoints = array("i")
+    for i in range(initial_nodes):
+        for j in range(i):
+            endpoints.append(i)
+            endpoints.append(j)
+            yield i, j
+    for new_node in range(initial_nodes, n):
+        targets = set()
+        while len(targets) < d:
+            targets.add(endpoints[random.randrange(len(endpoints))])
+        # Endpoints are added after choosing all the targets, so the degrees
+        # used for the d picks are the ones before the new node arrived
+        for target in targets:
+            endpoints.append(new_node)
+            endpoints.append(target)
+            yield new_node, target
+
+
+def dorogovtsev_mendes_edges(n: int) -> tuple:
+    """
+    Generate the edges of a Dorogovtsev-Mendes graph: it starts from a triangle and
+    each new node picks a random edge and links to both of its nodes.
+    The edges live in two preallocated integer arrays, so the random edge is
+    picked in O(1) and the whole process is O(n)
+    :param n: number of nodes added to the initial triangle
+    :return: (sources, targets) arrays, edge k goes from sources[k] to targets[k]
+    """
+    num_edges = 3 + 2 * n
+    sources = array("i", [0]) * num_edges
+    targets = array("i", [0]) * num_edges
+    sources[0], targets[0] = 0, 1
+    sources[1], targets[1] = 1, 2
+    sources[2], targets[2] = 2, 0
+    filled = 3
+    for new_node in range(3, 3 + n):
+        selected_edge = random.randrange(filled)
+        sources[filled], targets[filled] = new_node, sources[selected_edge]
+        sources[filled + 1], targets[filled + 1] = new_node, targets[selected_edge]
+        filled += 2
+    return sources, targets
+
+
+def graph_name_from_file(file_path: str, add_random_weigth: bool = False) -> str:
+    """
+    Return the name given to the graph read from a file: the file name without extensions
+    :param file_path: path to the file
+    :param add_random_weigth: add the _weigth suffix of the graphs with random weights
+    :return: name of the graph
+    """
+    graph_name = os.path.basename(file_path).split(".")[0]
+    return graph_name + "_weigth" if add_random_weigth else graph_name
+
+
+def read_dot_edges(file_path: str, add_random_weigth: bool = False) -> DotEdges:
+    """
+    Read the edge arrays of a file in graphViz format, named as read_graph_from_file names them
+    :param file_path: path to the file
+    :param add_random_weigth: replace the weights of the file by random weights between 1 and 100
+    :return: nodes and edges of the file, use to_graph or freeze to build the graph
+    """
+    dot_edges = read_dot(file_path)
+    dot_edges.name = graph_name_from_file(file_path, add_random_weigth)
+    if add_random_weigth:
+        dot_edges.weights = array("q", [random.randint(1, 100) for _ in dot_edges.weights])
+    return dot_edges
+
+
 def read_graph_from_file(file_path: str, add_random_weigth: bool = False) -> Graph:
     """
-    Read a graph from a file
+    Read a graph from a file in graphViz format, plain or gzipped
     :param file_path: path to the file
+    :param add_random_weigth: replace the weights of the file by random weights between 1 and 100
     :return: graph object
     """
-    if add_random_weigth:
-        graph_name = file_path.split("/")[-1].split(".")[0] + "_weigth"
-    else:
-        graph_name = file_path.split("/")[-1].split(".")[0]
-    graph = Graph(name = graph_name)
     print(f"Reading graph from file: {file_path}")
-    with open(file_path, 'r') as f:
-        for line in f:
-            if line.startswith(('graph', '{', '}')):
-                continue
-            line = line.strip(' \n').strip(';')
-            line = line.replace('->', '').replace("N_","").split()
-            if len(line) == 1:
-                # Only one node in the line
-                # node1 = Node(line[0])
-                # node2 = None
-                # weight = 1
-                continue
-            elif len(line) == 2:
-                # Two nodes in the line without weight
-                node1, node2 = Node(line[0]), Node(line[1])
-                weight = 1
-            elif len(line) == 3:
-                # Two nodes in the line with weight
-                node1, node2, weight = Node(line[0]), Node(line[1]), int(line[2].strip("[label=").strip("]"))
-            if add_random_weigth:
-                weight = random.randint(1, 100)
-            graph.add_validated_edge(node1, node2, weight)
-    if graph.get_nodes() == []:
+    graph = read_dot_edges(file_path, add_random_weigth).to_graph()
+    if not graph.nodes:
         print("Graph is empty")
     return graph
 
 
-def get_files_in_folder(folder: str = "outputs") -> list:
+def get_files_in_folder(folder: str = "outputs", recursive: bool = False) -> list:
     """
     Get all files .dot in a folder
     Args:
         folder: folder to search, default to 'outputs'
+        recursive: search the subfolders too (bfs/, dfs_i/, mst_prim/...)
     Returns:
-        list of files in the folder
+        list of files in the folder, as paths relative to it, sorted
     """
-
+    if not recursive:
+        return sorted(file for file in os.listdir(folder) if file.endswith(".dot"))
     list_of_files = list()
-    for file in os.listdir(folder):
-        if file.endswith(".dot"):
-            list_of_files.append(file)
-    return list_of_files
+    for root, _, files in os.walk(folder):
+        relative_root = os.path.relpath(root, folder)
+        for file in files:
+            if file.endswith(".dot"):
+                list_of_files.append(file if relative_root == "." else os.path.join(relative_root, file))
+    return sorted(list_of_files)
@@ -1,5 +1,8 @@
 from generators import algorithms
+from models.profiling import PROFILER
 import argparse
+import cProfile
+import tracemalloc
 
 
 def generate_graph(args):
@@ -36,7 +39,7 @@ def generate_graph(args):
         elif not args.directed and args.m > ((args.n * (args.n - 1)) / 2):
             raise ValueError("m must be smaller than n(n-1)/2")
 
-        graph = dict_options[args.type](n=args.n, m=args.m)
+        graph = dict_options[args.type](n=args.n, m=args.m, is_directed=args.directed, graph_name=args.output)
 
         print("List of nodes: ", graph.nodes)
         print(len(graph.nodes))
@@ -87,8 +90,42 @@ def main():
     parser.add_argument("-d", "--directed", action=argparse.BooleanOptionalAction, help="If the graph is directed", default=False)
     parser.add_argument("-o", "--output", type=str, help="Output file name", default="")
 
+    parser.add_argument("--profile", action="store_true", help="Print the time of each phase and the hot path counters")
+    parser.add_argument("--profile-output", type=str, help="With --profile, save cProfile stats to this file")
+    parser.add_argument("--memory-snapshot", type=str, help="With --profile, save a tracemalloc snapshot to this file")
+
     args = parser.parse_args()
-    generate_graph(args)
+    if not args.profile:
+        generate_graph(args)
+        return
+    run_profiled(args)
+
+
+def run_profiled(args):
+    """
+    Run generate_graph with the profiler of models.profiling enabled and print its summary.
+    cProfile and tracemalloc only run if their output files are given, they slow the run down
+    """
+    PROFILER.enable()
+    if args.memory_snapshot:
+        tracemalloc.start()
+    profile = cProfile.Profile() if args.profile_output else None
+    try:
+        with PROFILER.phase("generate_graph"):
+            if profile is not None:
+                profile.runcall(generate_graph, args)
+            else:
+                generate_graph(args)
+    finally:
+        PROFILER.disable()
+        print(PROFILER.summary())
+        if profile is not None:
+            profile.dump_stats(args.profile_output)
+            print(f"cProfile stats saved to {args.profile_output}")
+        if args.memory_snapshot:
+            tracemalloc.take_snapshot().dump(args.memory_snapshot)
+            tracemalloc.stop()
+            print(f"Memory snapshot saved to {args.memory_snapshot}")
 
 
 if __name__ == "__main__":
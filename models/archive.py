@@ -0,0 +1,234 @@
+"""
+Binary archive of graphs, opened with mmap as FrozenGraph snapshots without copying them
+"""
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+from models.csr import FrozenGraph
+
+# File layout, version 1:
+#   header     magic, version, byte order, number of graphs, offset and length of the directory
+#   sections   per graph, aligned to 8 bytes: name_offsets (q, num_nodes + 1), names (UTF-8),
+#              indptr (q, num_nodes + 1), indices (i, stored edges), weights (q, stored edges)
+#   directory  JSON list with the name, flags, sizes and section offsets of every graph
+ARCHIVE_MAGIC = b"GLAR"
+ARCHIVE_VERSION = 1
+HEADER = struct.Struct("<4sHBxIQQ")
+BYTE_ORDERS = {"little": 0, "big": 1}
+# Arrays of each graph section, with their typecodes, in the order they are written
+SECTIONS = (("name_offsets", "q"), ("names", "B"), ("indptr", "q"), ("indices", "i"), ("weights", "q"))
+
+
+class ArchiveNames(Sequence):
+    """
+    Read-only sequence with the node names of a graph in an archive,
+    decoded from the mapped file when they are asked for
+    """
+    __slots__ = ("offsets", "blob")
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, node_id: int) -> str:
+        if node_id < 0:
+            node_id += len(self)
+        if not 0 <= node_id < len(self):
+            raise IndexError(f"Node id {node_id} out of range")
+        return bytes(self.blob[self.offsets[node_id]:self.offsets[node_id + 1]]).decode("UTF-8")
+
+
+def _graph_arrays(graph) -> dict:
+    """
+    Return the arrays of the sections of a graph, freezing it if it is a Graph
+    """
+    frozen = graph if isinstance(graph, FrozenGraph) else graph.freeze()
+    encoded = [node_name.encode("UTF-8") for node_name in frozen.names]
+    name_offsets = array("q", [0]) * (len(encoded) + 1)
+    position = 0
+    for node_id, node_name in enumerate(encoded):
+        position += len(node_name)
+        name_offsets[node_id + 1] = position
+    return {
+        "graph": frozen,
+        "name_offsets": name_offsets,
+        "names": b"".join(encoded),
+        "indptr": frozen.indptr,
+        "indices": frozen.indices,
+        "weights": frozen.weights,
+    }
+
+
+def write_archive(target, graphs) -> int:
+    """
+    Write graphs to a binary archive that open_archive maps without reading it
+    Args:
+        target (str | PathLike | stream): path of the file, or a seekable binary stream
+        graphs (iterable): Graph, FrozenGraph or any graph with freeze(), with different names
+    Returns:
+        int: number of graphs written
+
+    Examples:
+
+        >>> write_archive("outputs/graphs.glar", graphs)
+        >>> open_archive("outputs/graphs.glar")["MST_Prim_graph_Mesh_10x10"].shortest_paths("N_1_1")
+    """
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, "wb") as file:
+            return write_archive(file, graphs)
+    start = target.tell()
+    target.write(b"\0" * HEADER.size)
+    position = HEADER.size
+    directory = list()
+    seen = set()
+    for graph in graphs:
+        if graph.name in seen:
+            raise ValueError(f"Graph {graph.name} is repeated, archives are indexed by name")
+        seen.add(graph.name)
+        arrays = _graph_arrays(graph)
+        entry = {"name": graph.name, "is_directed": arrays["graph"].is_directed,
+                 "num_nodes": len(arrays["graph"].names), "stored_edges": len(arrays["indices"])}
+        for section, _ in SECTIONS:
+            # Every array starts at a multiple of 8, so the mapped views can be cast in place
+            padding = -position % 8
+            target.write(b"\0" * padding)
+            position += padding
+            data = memoryview(arrays[section]).cast("B")
+            target.write(data)
+            entry[section] = position
+            position += len(data)
+        directory.append(entry)
+    encoded_directory = json.dumps(directory).encode("UTF-8")
+    target.write(encoded_directory)
+    end = target.tell()
+    target.seek(start)
+    target.write(HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, BYTE_ORDERS[sys.byteorder],
+                             len(directory), position, len(encoded_directory)))
+    target.seek(end)
+    return len(directory)
+
+
+def archive_bytes(graphs) -> bytes:
+    """
+    Return the archive of some graphs as bytes, to send them to other processes
+    """
+    buffer = io.BytesIO()
+    write_archive(buffer, graphs)
+    return buffer.getvalue()
+
+
+class GraphArchive:
+    """
+    Graphs of a binary archive written by write_archive. The file is mapped, not read:
+    opening only parses the directory, and each graph is a FrozenGraph over
+    views of the mapped arrays, created when it is asked for by name
+
+    - Attributes:
+        - names (list): names of the graphs, in the order they were written
+
+    - Examples:
+
+        >>> with open_archive("outputs/graphs.glar") as archive:
+        ...     for graph in archive:
+        ...         print(graph.name, graph.num_edges)
+    """
+
+    def __init__(self, buffer, file=None):
+        self._buffer = buffer
+        self._file = file
+        self._view = memoryview(buffer)
+        if len(self._view) < HEADER.size:
+            raise ValueError("Not a graph archive: the file is too small")
+        magic, version, byte_order, count, directory_offset, directory_length = HEADER.unpack_from(self._view)
+        if magic != ARCHIVE_MAGIC:
+            raise ValueError("Not a graph archive: wrong magic number")
+        if version != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported graph archive version {version}, expected {ARCHIVE_VERSION}")
+        if byte_order != BYTE_ORDERS[sys.byteorder]:
+            raise ValueError("The graph archive was written on a machine with another byte order")
+        directory = json.loads(bytes(self._view[directory_offset:directory_offset + directory_length]))
+        if len(directory) != count:
+            raise ValueError("Corrupted graph archive: the directory does not match the header")
+        self._entries = {entry["name"]: entry for entry in directory}
+        self.names = [entry["name"] for entry in directory]
+
+    def _section(self, entry: dict, section: str, typecode: str, length: int) -> memoryview:
+        offset = entry[section]
+        size = length * array(typecode).itemsize
+        return self._view[offset:offset + size].cast(typecode)
+
+    def __getitem__(self, name: str) -> FrozenGraph:
+        try:
+            entry = self._entries[name]
+        except KeyError:
+            raise KeyError(f"Graph {name} not found in the archive") from None
+        num_nodes, stored_edges = entry["num_nodes"], entry["stored_edges"]
+        name_offsets = self._section(entry, "name_offsets", "q", num_nodes + 1)
+        names = ArchiveNames(name_offsets, self._section(entry, "names", "B", name_offsets[-1]))
+        return FrozenGraph(names,
+                           self._section(entry, "indptr", "q", num_nodes + 1),
+                           self._section(entry, "indices", "i", stored_edges),
+                           self._section(entry, "weights", "q", stored_edges),
+                           is_directed=entry["is_directed"],
+                           name=name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self):
+        for name in self.names:
+            yield self[name]
+
+    def close(self) -> None:
+        """
+        Close the mapped file. Graphs still in use keep their views, the mapping
+        is then released when the last of them is garbage collected
+        """
+        self._view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            try:
+                self._buffer.close()
+            except BufferError:
+                pass
+        if self._file is not None:
+            self._file.close()
+
+    def __enter__(self) -> 'GraphArchive':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"GraphArchive(graphs={len(self)})"
+
+
+def open_archive(source) -> GraphArchive:
+    """
+    Open a graph archive
+    Args:
+        source (str | PathLike | bytes): path of the file, or the bytes returned by archive_bytes
+    Returns:
+        GraphArchive: graphs of the archive, by name
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return GraphArchive(source)
+    file = open(source, "rb")
+    try:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        file.close()
+        raise ValueError(f"Not a graph archive: {source} is empty") from None
+    return GraphArchive(buffer, file)
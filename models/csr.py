@@ -0,0 +1,630 @@
+"""
+Compressed sparse row snapshot of a graph
+"""
+from array import array
+from collections.abc import MutableSequence, Sequence
+from dataclasses import dataclass
+import heapq
+
+from models.profiling import PROFILER
+
+# Events yielded by IndexedGraph.dfs_events
+DFS_PRE = "pre"
+DFS_POST = "post"
+DFS_TREE_EDGE = "tree_edge"
+# Visit orders of IndexedGraph.dfs_events
+DFS_RECURSIVE = "recursive"
+DFS_STACK = "stack"
+
+
+class IndexedGraph:
+    """
+    Base class of the read-only graphs whose nodes are the integers range(num_nodes),
+    like FrozenGraph and MeshGraph. Subclasses give the attributes name, is_directed
+    and names, and the methods num_nodes, num_edges, index_of, neighbors,
+    weighted_neighbors, degree and transpose. The traversal and shortest path
+    algorithms are written only in terms of those, so they run on any of them
+    """
+    __slots__ = ()
+
+    def name_of(self, node_id: int) -> str:
+        """
+        Return the name of the node with the given integer id
+        """
+        return self.names[node_id]
+
+    def edges(self):
+        """
+        Iterate over the edges as (source id, target id, weight),
+        yielding each undirected edge once
+        """
+        for source in range(self.num_nodes):
+            for target, weight in self.weighted_neighbors(source):
+                if self.is_directed or source < target:
+                    yield source, target, weight
+
+    def to_graph(self, name: str = None):
+        """
+        Build a mutable Graph with the nodes and edges of the graph
+        Args:
+            name (str): name of the new graph, the name of this graph by default
+        Returns:
+            Graph: new graph
+        """
+        from models.graph import Graph
+        graph = Graph(is_directed=self.is_directed, name=name or self.name)
+        nodes = [graph.get_or_create_node(node_name) for node_name in self.names]
+        for source, target, weight in self.edges():
+            graph.add_edge(nodes[source], nodes[target], weight)
+        return graph
+
+    def tree_to_graph(self, parent, name: str) -> 'Graph':
+        """
+        Build a Graph with the tree edges (parent[v], v) of a traversal result
+        Args:
+            parent (sequence): parent id of each node, -1 for roots and unreached nodes
+            name (str): name of the new graph
+        Returns:
+            Graph: tree as a graph
+        """
+        from models.graph import Graph
+        tree = Graph(name=name)
+        for node_id, parent_id in enumerate(parent):
+            if parent_id >= 0:
+                tree.add_edge(tree.get_or_create_node(self.names[parent_id]),
+                              tree.get_or_create_node(self.names[node_id]))
+        return tree
+
+    @PROFILER.profiled("bfs")
+    def bfs(self, source=0, direction_optimizing: bool = True, alpha: float = 14, beta: float = 24) -> 'BFSResult':
+        """
+        Breadth first search from a source node, level by level.
+        With direction_optimizing each level is expanded top-down (frontier nodes look
+        at their neighbors) or bottom-up (unvisited nodes look for a parent in the
+        frontier), whichever has to check fewer edges. Bottom-up levels pay off on large
+        low diameter graphs, like Barabasi-Albert ones, where the frontier gets huge.
+        Args:
+            source (int | str | Node): starting node
+            direction_optimizing (bool): allow bottom-up levels, only top-down if False
+            alpha (float): go bottom-up when the frontier is growing and its edges exceed
+                the edges of the unvisited nodes divided by alpha
+            beta (float): go back top-down when the frontier has less than
+                num_nodes / beta nodes
+        Returns:
+            BFSResult: parent, depth and frontier of each level
+        """
+        source = self.index_of(source)
+        num_nodes = self.num_nodes
+        degree = self.degree
+        parent = array("i", [-1]) * num_nodes
+        depth = array("i", [-1]) * num_nodes
+        depth[source] = 0
+        frontier = array("i", [source])
+        levels = [frontier]
+        # In directed graphs the bottom-up steps need the edges that reach each node
+        reverse = self.transpose() if direction_optimizing and self.is_directed else self
+        # Undirected edges are counted once from each of their nodes
+        total_edges = self.num_edges if self.is_directed else 2 * self.num_edges
+        frontier_edges = degree(source)
+        unvisited_edges = total_edges - frontier_edges
+        bottom_up = False
+        previous_size = 0
+        level = 0
+        while frontier:
+            level += 1
+            if direction_optimizing:
+                if not bottom_up:
+                    # A shrinking frontier, like the end of a search on a mesh, does not pay
+                    # for a bottom-up step that scans every node
+                    bottom_up = frontier_edges > unvisited_edges / alpha and len(frontier) > previous_size
+                else:
+                    bottom_up = len(frontier) >= num_nodes / beta
+            next_frontier = array("i")
+            if bottom_up:
+                reverse_neighbors = reverse.neighbors
+                previous_level = level - 1
+                for node in range(num_nodes):
+                    if depth[node] >= 0:
+                        continue
+                    for candidate in reverse_neighbors(node):
+                        if depth[candidate] == previous_level:
+                            parent[node] = candidate
+                            depth[node] = level
+                            next_frontier.append(node)
+                            break
+            else:
+                neighbors = self.neighbors
+                for node in frontier:
+                    for neighbor in neighbors(node):
+                        if depth[neighbor] < 0:
+                            depth[neighbor] = level
+                            parent[neighbor] = node
+                            next_frontier.append(neighbor)
+            if direction_optimizing:
+                previous_size = len(frontier)
+                # Each node is counted once, when it joins the frontier
+                frontier_edges = sum(map(degree, next_frontier))
+                unvisited_edges -= frontier_edges
+            if next_frontier:
+                levels.append(next_frontier)
+            frontier = next_frontier
+        if PROFILER.enabled:
+            PROFILER.count("bfs.nodes_visited", sum(map(len, levels)))
+        return BFSResult(self, source, parent, depth, levels)
+
+    def dfs_events(self, source=0, order: str = DFS_RECURSIVE):
+        """
+        Depth first search from a source node, yielding its events lazily as
+        (event, node id, other node id) tuples:
+        - (DFS_TREE_EDGE, parent, child) when child is discovered from parent
+        - (DFS_PRE, node, parent) when the search enters node, parent is -1 for the source
+        - (DFS_POST, node, parent) when every node discovered from node is finished
+        It keeps its own stack, so deep graphs never hit the recursion limit. O(V + E)
+        Args:
+            source (int | str | Node): starting node
+            order (str): DFS_RECURSIVE to visit the nodes as a recursive search would,
+                entering each neighbor as soon as it is found. DFS_STACK for the order of
+                Graph.get_dfs_iterative: all the unvisited neighbors of a node are marked
+                and pushed at once, and the last one pushed is entered first
+        Yields:
+            tuple: (event, node id, other node id)
+        """
+        if order not in (DFS_RECURSIVE, DFS_STACK):
+            raise ValueError(f"order must be '{DFS_RECURSIVE}' or '{DFS_STACK}'")
+        source = self.index_of(source)
+        neighbors = self.neighbors
+        visited = bytearray(self.num_nodes)
+        visited[source] = 1
+        if order == DFS_RECURSIVE:
+            yield DFS_PRE, source, -1
+            # Each stack item is a node, its parent and the iterator over its neighbors
+            stack = [(source, -1, iter(neighbors(source)))]
+            while stack:
+                current, parent, pending = stack[-1]
+                for neighbor in pending:
+                    if not visited[neighbor]:
+                        break
+                else:
+                    stack.pop()
+                    yield DFS_POST, current, parent
+                    continue
+                visited[neighbor] = 1
+                yield DFS_TREE_EDGE, current, neighbor
+                yield DFS_PRE, neighbor, current
+                stack.append((neighbor, current, iter(neighbors(neighbor))))
+        else:
+            # Stack items are (node, parent, entered): entered is False the first time a
+            # node is popped and True for the copy left below its children to report DFS_POST
+            stack = [(source, -1, False)]
+            while stack:
+                current, parent, entered = stack.pop()
+                if entered:
+                    yield DFS_POST, current, parent
+                    continue
+                yield DFS_PRE, current, parent
+                stack.append((current, parent, True))
+                for neighbor in neighbors(current):
+                    if not visited[neighbor]:
+                        visited[neighbor] = 1
+                        yield DFS_TREE_EDGE, current, neighbor
+                        stack.append((neighbor, current, False))
+
+    @PROFILER.profiled("dfs")
+    def dfs(self, source=0, order: str = DFS_RECURSIVE) -> 'DFSResult':
+        """
+        Depth first search from a source node, collecting the events of dfs_events
+        Args:
+            source (int | str | Node): starting node
+            order (str): DFS_RECURSIVE or DFS_STACK, see dfs_events
+        Returns:
+            DFSResult: pre-order, post-order and parent of each node
+        """
+        parent = array("i", [-1]) * self.num_nodes
+        preorder, postorder = array("i"), array("i")
+        for event, node, other in self.dfs_events(source, order):
+            if event == DFS_TREE_EDGE:
+                parent[other] = node
+            elif event == DFS_PRE:
+                preorder.append(node)
+            else:
+                postorder.append(node)
+        if PROFILER.enabled:
+            PROFILER.count("dfs.nodes_visited", len(preorder))
+        return DFSResult(self, preorder[0], parent, preorder, postorder)
+
+    @PROFILER.profiled("dijkstra")
+    def shortest_paths(self, source=0, target=None) -> 'ShortestPaths':
+        """
+        Dijkstra shortest paths from a source node using a binary heap
+        with lazy deletion of outdated entries.
+        If a target is given the search stops when the target is settled
+        Args:
+            source (int | str | Node): starting node
+            target (int | str | Node): node to stop at, or None to reach every node
+        Returns:
+            ShortestPaths: distance and parent of every node
+        """
+        source = self.index_of(source)
+        target = -1 if target is None else self.index_of(target)
+        weighted_neighbors = self.weighted_neighbors
+        # Every successful relaxation pushes the node, so the pushes count the relaxed edges
+        heappush = PROFILER.counting(heapq.heappush, "dijkstra.heap_pushes")
+        heappop = PROFILER.counting(heapq.heappop, "dijkstra.heap_pops")
+        distance = [float("inf")] * self.num_nodes
+        parent = array("i", [-1]) * self.num_nodes
+        distance[source] = 0
+        heap = [(0, source)]
+        while heap:
+            current_distance, current = heappop(heap)
+            if current_distance > distance[current]:
+                continue
+            if current == target:
+                break
+            for neighbor, weight in weighted_neighbors(current):
+                new_distance = current_distance + weight
+                if new_distance < distance[neighbor]:
+                    distance[neighbor] = new_distance
+                    parent[neighbor] = current
+                    heappush(heap, (new_distance, neighbor))
+        return ShortestPaths(self, source, distance, parent, None if target < 0 else target)
+
+    def __len__(self) -> int:
+        return self.num_nodes
+
+
+class FrozenGraph(IndexedGraph):
+    """
+    Immutable compressed sparse row (CSR) snapshot of a graph, made to run
+    read-only algorithms without walking Node and Edge objects.
+    Nodes are identified by an integer in range(num_nodes), the neighbors of
+    node u are indices[indptr[u]:indptr[u + 1]] and the weights of those
+    edges are weights[indptr[u]:indptr[u + 1]]. Undirected edges are stored
+    in both directions.
+
+    - Attributes:
+        - name (str): name of the graph
+        - is_directed (bool): flag to indicate if the graph is directed
+        - names (list): name of each node, by integer id
+        - indptr (memoryview): offsets of the neighbors of each node, num_nodes + 1 items
+        - indices (memoryview): neighbor ids, num_edges items
+        - weights (memoryview): weight of each stored edge, num_edges items
+
+    - Examples:
+
+        >>> graph = Graph()
+        >>> graph.add_edge(Node('A'), Node('B'), 3)
+        >>> frozen = graph.freeze()
+        >>> frozen.names[frozen.indices[0]]
+        'N_B'
+    """
+    __slots__ = ("name", "is_directed", "names", "indptr", "indices", "weights", "_index")
+
+    def __init__(self,
+                 names: list,
+                 indptr,
+                 indices,
+                 weights,
+                 is_directed: bool = False,
+                 name: str = "FrozenGraph"):
+        set_attribute = object.__setattr__
+        set_attribute(self, "name", name)
+        set_attribute(self, "is_directed", is_directed)
+        # Read-only sequences (like the names of a GraphArchive) are kept as they are,
+        # anything else is copied so later changes to it do not reach the snapshot
+        if not isinstance(names, Sequence) or isinstance(names, MutableSequence):
+            names = list(names)
+        set_attribute(self, "names", names)
+        set_attribute(self, "indptr", _readonly(indptr))
+        set_attribute(self, "indices", _readonly(indices))
+        set_attribute(self, "weights", _readonly(weights))
+        # Built on the first lookup by name, graphs used only by id never pay for it
+        set_attribute(self, "_index", None)
+        if len(self.indptr) != len(self.names) + 1:
+            raise ValueError("indptr must have one item more than the number of nodes")
+        if len(self.indices) != len(self.weights) or len(self.indices) != self.indptr[-1]:
+            raise ValueError("indices and weights must have indptr[-1] items")
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenGraph is immutable")
+
+    @classmethod
+    def from_edge_arrays(cls,
+                         names: list,
+                         sources,
+                         targets,
+                         weights=None,
+                         is_directed: bool = False,
+                         name: str = "FrozenGraph") -> 'FrozenGraph':
+        """
+        Build the CSR snapshot from parallel arrays of edges, using a counting sort
+        by source node so the whole build is O(V + E)
+        Args:
+            names (list): name of each node, by integer id
+            sources (sequence): integer id of the starting node of each edge
+            targets (sequence): integer id of the ending node of each edge
+            weights (sequence): weight of each edge, 1 for every edge if not given
+            is_directed (bool): if False every edge is stored in both directions
+            name (str): name of the graph
+        Returns:
+            FrozenGraph: snapshot with the given edges
+        """
+        num_nodes = len(names)
+        if weights is None:
+            weights = array("q", [1]) * len(sources)
+        if not len(sources) == len(targets) == len(weights):
+            raise ValueError("sources, targets and weights must have the same length")
+
+        counts = [0] * (num_nodes + 1)
+        for source in sources:
+            counts[source + 1] += 1
+        if not is_directed:
+            for target in targets:
+                counts[target + 1] += 1
+        for node_id in range(num_nodes):
+            counts[node_id + 1] += counts[node_id]
+        indptr = array("q", counts)
+
+        num_slots = counts[-1]
+        indices = array("i", [0]) * num_slots
+        csr_weights = array("q", [0]) * num_slots
+        # counts is reused as the next free slot of each node
+        if not is_directed:
+            # The edges that end at a node go first, as Node.get_edges lists in_edges
+            # before out_edges, so traversals visit the neighbors in the same order
+            for source, target, weight in zip(sources, targets, weights):
+                slot = counts[target]
+                indices[slot] = source
+                csr_weights[slot] = weight
+                counts[target] = slot + 1
+        for source, target, weight in zip(sources, targets, weights):
+            slot = counts[source]
+            indices[slot] = target
+            csr_weights[slot] = weight
+            counts[source] = slot + 1
+        return cls(names, indptr, indices, csr_weights, is_directed=is_directed, name=name)
+
+    @property
+    def num_nodes(self) -> int:
+        """
+        Return the number of nodes in the snapshot
+        """
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        """
+        Return the number of edges in the snapshot, each undirected edge counted once
+        """
+        if self.is_directed:
+            return len(self.indices)
+        return len(self.indices) // 2
+
+    def index_of(self, node) -> int:
+        """
+        Return the integer id of a node
+        Args:
+            node (int | str | Node): integer id, name or node of the original graph
+        Returns:
+            int: integer id of the node
+        """
+        if isinstance(node, int):
+            if not 0 <= node < len(self.names):
+                raise IndexError(f"Node id {node} out of range")
+            return node
+        node_name = node if isinstance(node, str) else node.name
+        if self._index is None:
+            object.__setattr__(self, "_index", {name: node_id for node_id, name in enumerate(self.names)})
+        try:
+            return self._index[node_name]
+        except KeyError:
+            raise KeyError(f"Node {node_name} not found in {self.name}") from None
+
+    def neighbors(self, node_id: int) -> memoryview:
+        """
+        Return the integer ids of the nodes reached by the edges of a node
+        """
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def weighted_neighbors(self, node_id: int) -> zip:
+        """
+        Return pairs (neighbor id, edge weight) for the edges of a node
+        """
+        start, end = self.indptr[node_id], self.indptr[node_id + 1]
+        return zip(self.indices[start:end], self.weights[start:end])
+
+    def degree(self, node_id: int) -> int:
+        """
+        Return the number of edges stored for a node, the outdegree in directed graphs
+        """
+        return self.indptr[node_id + 1] - self.indptr[node_id]
+
+    def edges(self):
+        """
+        Iterate over the edges as (source id, target id, weight),
+        yielding each undirected edge once
+        """
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        for source in range(len(self.names)):
+            for slot in range(indptr[source], indptr[source + 1]):
+                target = indices[slot]
+                if self.is_directed or source < target:
+                    yield source, target, weights[slot]
+
+    def transpose(self) -> 'FrozenGraph':
+        """
+        Return the snapshot with every edge reversed, the snapshot itself if it is undirected
+        """
+        if not self.is_directed:
+            return self
+        sources = array("i", [0]) * len(self.indices)
+        for source in range(len(self.names)):
+            for slot in range(self.indptr[source], self.indptr[source + 1]):
+                sources[slot] = source
+        return FrozenGraph.from_edge_arrays(self.names, self.indices, sources, self.weights,
+                                            is_directed=True, name=self.name)
+
+    def __repr__(self) -> str:
+        return f"FrozenGraph({self.name}, nodes={self.num_nodes}, edges={self.num_edges})"
+
+
+@dataclass
+class BFSResult:
+    """
+    Result of a breadth first search
+
+    Attributes:
+        graph (IndexedGraph): graph the search ran on
+        source (int): id of the starting node
+        parent (array): id of the node that discovered each node,
+            -1 for the source and the nodes not reached
+        depth (array): number of edges from the source to each node, -1 if not reached
+        levels (list): one array per level with the ids of the nodes at that depth
+    """
+    graph: IndexedGraph
+    source: int
+    parent: array
+    depth: array
+    levels: list
+
+    def order(self) -> list:
+        """
+        Return the ids of the nodes reached, level by level
+        """
+        return [node_id for level in self.levels for node_id in level]
+
+    def to_graph(self, name: str = None):
+        """
+        Build a Graph with the edges of the BFS tree
+        Args:
+            name (str): name of the tree, BFS_<graph name> by default
+        """
+        return self.graph.tree_to_graph(self.parent, name or f"BFS_{self.graph.name}")
+
+
+@dataclass
+class DFSResult:
+    """
+    Result of a depth first search
+
+    Attributes:
+        graph (IndexedGraph): graph the search ran on
+        source (int): id of the starting node
+        parent (array): id of the node that discovered each node,
+            -1 for the source and the nodes not reached
+        preorder (array): ids of the nodes in the order the search entered them
+        postorder (array): ids of the nodes in the order the search finished them
+    """
+    graph: IndexedGraph
+    source: int
+    parent: array
+    preorder: array
+    postorder: array
+
+    def to_graph(self, name: str = None):
+        """
+        Build a Graph with the edges of the DFS tree
+        Args:
+            name (str): name of the tree, DFS_<graph name> by default
+        """
+        return self.graph.tree_to_graph(self.parent, name or f"DFS_{self.graph.name}")
+
+
+@dataclass
+class ShortestPaths:
+    """
+    Result of a single source shortest path search
+
+    Attributes:
+        graph (IndexedGraph): graph the search ran on
+        source (int): id of the starting node
+        distance (list): length of the shortest path to each node, inf if not reached
+        parent (array): previous node in the shortest path to each node,
+            -1 for the source and the nodes not reached
+        target (int): id of the node the search stopped at, None if it reached every node
+
+    Examples:
+        >>> result = graph.shortest_paths('N_0', target='N_5')
+        >>> result.distance_to('N_5')
+        >>> result.path_to('N_5')
+    """
+    graph: IndexedGraph
+    source: int
+    distance: list
+    parent: array
+    target: int = None
+
+    def distance_to(self, node) -> float:
+        """
+        Return the length of the shortest path to a node, inf if it was not reached
+        """
+        return self.distance[self.graph.index_of(node)]
+
+    def path_to(self, node) -> list:
+        """
+        Return the names of the nodes in the shortest path from the source to a node,
+        an empty list if it was not reached
+        """
+        node_id = self.graph.index_of(node)
+        if self.distance[node_id] == float("inf"):
+            return []
+        path = []
+        while node_id >= 0:
+            path.append(self.graph.names[node_id])
+            node_id = self.parent[node_id]
+        path.reverse()
+        return path
+
+    def distances(self) -> dict:
+        """
+        Return a dict from node name to distance for the nodes reached
+        """
+        names = self.graph.names
+        infinity = float("inf")
+        return {names[node_id]: node_distance for node_id, node_distance in enumerate(self.distance)
+                if node_distance != infinity}
+
+    def predecessors(self) -> dict:
+        """
+        Return a dict from node name to the name of its predecessor for the nodes reached,
+        None for the source
+        """
+        names = self.graph.names
+        infinity = float("inf")
+        return {names[node_id]: names[parent_id] if parent_id >= 0 else None
+                for node_id, parent_id in enumerate(self.parent)
+                if self.distance[node_id] != infinity}
+
+    def tree_edges(self):
+        """
+        Iterate over the edges of the shortest path tree as (parent name, node name, weight)
+        """
+        names = self.graph.names
+        for node_id, parent_id in enumerate(self.parent):
+            if parent_id >= 0:
+                yield names[parent_id], names[node_id], self.distance[node_id] - self.distance[parent_id]
+
+    def color_tree(self, graph) -> int:
+        """
+        Mark with alter_color the edges of a Graph that belong to the shortest path tree,
+        and unmark the rest, so save_graphviz_with_weigth draws the tree in red
+        Args:
+            graph (Graph): graph the snapshot was frozen from
+        Returns:
+            int: number of edges marked
+        """
+        for edge in graph.edges:
+            edge.alter_color = False
+        marked = 0
+        for parent_name, node_name, _ in self.tree_edges():
+            edge = graph.get_edge(parent_name, node_name)
+            if edge is not None:
+                edge.alter_color = True
+                marked += 1
+        return marked
+
+
+def _readonly(values) -> memoryview:
+    """
+    Return a read-only memoryview over an array, bytes buffer or memoryview
+    """
+    return memoryview(values).toreadonly()
@@ -0,0 +1,275 @@
+"""
+Streaming writer and bulk reader of graphs in graphViz (DOT) format
+"""
+import gzip
+import io
+import mmap
+import os
+import re
+from array import array
+from dataclasses import dataclass, field
+
+from models.profiling import PROFILER
+
+# Lines are joined and written in batches of this size, instead of one write per edge
+LINES_PER_WRITE = 8192
+# gzip level 6 compresses almost as much as the default 9 in a fraction of the time
+COMPRESS_LEVEL = 6
+
+
+def _edge_lines(graph, with_weight: bool, by_node: bool):
+    """
+    Yield one DOT line per edge of a Graph, with its weight and color if asked
+    Args:
+        graph (Graph): graph to write
+        with_weight (bool): add the weight as label, and color=red to the edges with alter_color
+        by_node (bool): walk the edges node by node instead of in insertion order
+    """
+    if by_node:
+        def edges():
+            # Undirected edges are in the lists of both nodes, identities keep the check O(1)
+            written = set()
+            for node in graph.nodes:
+                if not node.out_edges:
+                    continue
+                for edge_list in (node.in_edges, node.out_edges):
+                    for edge in edge_list:
+                        if id(edge) not in written:
+                            written.add(id(edge))
+                            yield edge
+        edges = edges()
+    else:
+        edges = graph.edges
+    if not with_weight:
+        for edge in edges:
+            yield f"{edge.node_from.name} -> {edge.node_to.name}; \n"
+        return
+    for edge in edges:
+        color = ", color=red" if edge.alter_color else ""
+        yield f"{edge.node_from.name} -> {edge.node_to.name} [label={edge.weigth}{color}]; \n"
+
+
+def _indexed_edge_lines(graph, with_weight: bool):
+    """
+    Yield one DOT line per edge of an IndexedGraph (FrozenGraph, MeshGraph)
+    """
+    names = graph.names
+    for source, target, weight in graph.edges():
+        if with_weight:
+            yield f"{names[source]} -> {names[target]} [label={weight}]; \n"
+        else:
+            yield f"{names[source]} -> {names[target]}; \n"
+
+
+def _open_target(target, compress: bool):
+    """
+    Return (text stream, owned) for a path or a stream. Owned streams are
+    opened here and must be closed by the caller
+    """
+    if isinstance(target, (str, os.PathLike)):
+        if compress:
+            return gzip.open(target, "wt", compresslevel=COMPRESS_LEVEL, encoding="UTF-8"), True
+        return open(target, "w", encoding="UTF-8", buffering=1 << 20), True
+    if compress:
+        binary = target if _is_binary(target) else getattr(target, "buffer", None)
+        if binary is None:
+            raise ValueError(f"Cannot compress to the text stream {target!r}, "
+                             "pass a binary stream or a text stream with a buffer")
+        compressed = gzip.GzipFile(fileobj=binary, mode="wb", compresslevel=COMPRESS_LEVEL)
+        return io.TextIOWrapper(compressed, encoding="UTF-8"), True
+    if _is_binary(target):
+        # write_through avoids a second copy of the batches, detached below so the target stays open
+        return io.TextIOWrapper(target, encoding="UTF-8", write_through=True), True
+    return target, False
+
+
+def _is_binary(stream) -> bool:
+    return isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(stream, "mode", "")
+
+
+@PROFILER.profiled("write_dot")
+def write_dot(graph,
+              target,
+              with_weight: bool = False,
+              by_node: bool = False,
+              compress: bool = None) -> int:
+    """
+    Write a graph in graphViz format to a file or stream in a single pass.
+    Lines are written in batches of LINES_PER_WRITE, so big graphs are limited by the disk
+    Args:
+        graph (Graph | IndexedGraph): graph to write, a Graph or a FrozenGraph/MeshGraph
+        target (str | PathLike | stream): path of the file, or a text or binary stream,
+            which is left open
+        with_weight (bool): write the weights as labels and the edges with alter_color in red
+        by_node (bool): write the edges of a Graph node by node, as save_graphviz_by_node
+        compress (bool): gzip the output. By default only paths ending in .gz are compressed.
+            Text streams need an underlying binary buffer to be compressed
+    Returns:
+        int: number of edges written
+    Raises:
+        ValueError: if compress is asked for a text stream without buffer, like io.StringIO
+
+    Examples:
+
+        >>> write_dot(graph, "outputs/graph.dot.gz", with_weight=True)
+        >>> buffer = io.StringIO()
+        >>> write_dot(graph.freeze(), buffer)
+    """
+    if compress is None:
+        compress = isinstance(target, (str, os.PathLike)) and os.fspath(target).endswith(".gz")
+    if hasattr(graph, "_edge_index"):
+        lines = _edge_lines(graph, with_weight, by_node)
+    else:
+        lines = _indexed_edge_lines(graph, with_weight)
+    graph_type = "digraph" if graph.is_directed else "graph"
+    file, owned = _open_target(target, compress)
+    written = 0
+    try:
+        file.write(f"{graph_type} {graph.name}" + "{\n")
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) == LINES_PER_WRITE:
+                file.write("".join(batch))
+                written += len(batch)
+                batch.clear()
+        file.write("".join(batch))
+        written += len(batch)
+        file.write("}")
+        if PROFILER.enabled:
+            PROFILER.count("dot.edges_written", written)
+    finally:
+        if owned:
+            if isinstance(target, (str, os.PathLike)):
+                file.close()
+            else:
+                # Flush the wrappers without closing the stream of the caller
+                file.flush()
+                inner = file.detach()
+                if isinstance(inner, gzip.GzipFile):
+                    inner.close()
+        else:
+            file.flush()
+    return written
+
+
+# The subset of DOT written by write_dot: a graph header, then one statement per line
+# with a node or an edge and optional label and color attributes
+DOT_HEADER = re.compile(rb"^[ \t]*(?:strict[ \t]+)?(di)?graph[ \t]+([\w.\-]*)[ \t]*\{", re.MULTILINE)
+DOT_STATEMENT = re.compile(
+    rb"^[ \t]*([\w.]+)(?:[ \t]*-[->][ \t]*([\w.]+))?[ \t]*"
+    rb"(?:\[(?:label=(-?\d+))?(?:,?[ \t]*color=(\w+))?[^\]]*\])?[ \t]*;",
+    re.MULTILINE)
+NON_BLANK = re.compile(rb"\S")
+
+
+@dataclass
+class DotEdges:
+    """
+    Nodes and edges read from a DOT file, as parallel arrays over integer node ids
+
+    - Attributes:
+        - name (str): name of the graph in the header
+        - is_directed (bool): True if the header is digraph
+        - names (list): name of each node by integer id, in order of appearance
+        - sources (array): id of the starting node of each edge
+        - targets (array): id of the ending node of each edge
+        - weights (array): label of each edge, 1 for the edges without one
+        - colored (array): positions of the edges with a color attribute
+    """
+    name: str
+    is_directed: bool
+    names: list
+    sources: array = field(default_factory=lambda: array("i"))
+    targets: array = field(default_factory=lambda: array("i"))
+    weights: array = field(default_factory=lambda: array("q"))
+    colored: array = field(default_factory=lambda: array("i"))
+
+    def to_graph(self, name: str = None):
+        """
+        Build a mutable Graph with the nodes and edges
+        """
+        from models.graph import Graph
+        return Graph.from_edge_arrays(self.names, self.sources, self.targets, self.weights,
+                                      is_directed=self.is_directed, name=name or self.name,
+                                      colored=self.colored)
+
+    def freeze(self, name: str = None):
+        """
+        Build a FrozenGraph with the nodes and edges, without creating Node nor Edge objects
+        """
+        from models.csr import FrozenGraph
+        return FrozenGraph.from_edge_arrays(self.names, self.sources, self.targets, self.weights,
+                                            is_directed=self.is_directed, name=name or self.name)
+
+
+def parse_dot(buffer) -> DotEdges:
+    """
+    Parse the DOT text in a bytes-like buffer (bytes, mmap) in a single pass
+    Args:
+        buffer (bytes | mmap): content of the file
+    Returns:
+        DotEdges: nodes and edges of the graph, without any for empty or blank content
+    Raises:
+        ValueError: if the content is not blank and has no graph header
+    """
+    header = DOT_HEADER.search(buffer)
+    if header is None:
+        # Empty files hold an empty graph, as the old line by line reader returned
+        if NON_BLANK.search(buffer) is None:
+            return DotEdges(name="", is_directed=False, names=[])
+        raise ValueError("No graph header found in the DOT content")
+    result = DotEdges(name=header.group(2).decode(), is_directed=header.group(1) is not None, names=[])
+    ids = dict()
+    sources, targets, weights, colored = result.sources, result.targets, result.weights, result.colored
+    for source, target, label, color in DOT_STATEMENT.findall(buffer, header.end()):
+        source_id = ids.get(source)
+        if source_id is None:
+            source_id = ids[source] = len(ids)
+        if not target:
+            continue
+        target_id = ids.get(target)
+        if target_id is None:
+            target_id = ids[target] = len(ids)
+        if color:
+            colored.append(len(sources))
+        sources.append(source_id)
+        targets.append(target_id)
+        weights.append(int(label) if label else 1)
+    result.names = [node_name.decode() for node_name in ids]
+    if PROFILER.enabled:
+        PROFILER.count("dot.edges_read", len(sources))
+    return result
+
+
+@PROFILER.profiled("read_dot")
+def read_dot(source) -> DotEdges:
+    """
+    Read a DOT file written by write_dot, or by the save_graphviz_* methods of Graph.
+    Plain files are memory mapped instead of read line by line, gzip files are detected
+    by their content
+    Args:
+        source (str | PathLike | stream): path of the file, or a binary or text stream
+    Returns:
+        DotEdges: nodes and edges of the graph, use to_graph or freeze to build it
+
+    Examples:
+
+        >>> read_dot("outputs/graph.dot.gz").to_graph()
+        >>> read_dot(io.BytesIO(b"graph G{\\nN_0 -> N_1 [label=3]; \\n}")).freeze()
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        content = source.read()
+        if isinstance(content, str):
+            content = content.encode("UTF-8")
+        if content[:2] == b"\x1f\x8b":
+            content = gzip.decompress(content)
+        return parse_dot(content)
+    with open(source, "rb") as file:
+        if file.read(2) == b"\x1f\x8b":
+            file.seek(0)
+            return parse_dot(gzip.decompress(file.read()))
+        if os.fstat(file.fileno()).st_size == 0:
+            return parse_dot(b"")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return parse_dot(buffer)
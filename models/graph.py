@@ -1,9 +1,16 @@
 """
 Node class for graph
 """
+from array import array
 from dataclasses import dataclass
 from datetime import datetime
 
+from models import mst
+from models.csr import DFS_RECURSIVE, DFS_STACK, FrozenGraph, ShortestPaths
+from models.dot import write_dot
+from models.mst import MSTResult
+from models.profiling import PROFILER
+
 
 @dataclass
 class Node:
@@ -11,6 +18,9 @@ class Node:
     Node class to represent a node in a graph
     :param value: value to identify of the node   
     """
+    # Slots avoid a __dict__ per node, graphs with millions of nodes keep a much smaller footprint
+    __slots__ = ("name", "in_edges", "out_edges", "x_coord", "y_coord")
+
     def __init__(self, name: str, x_coord: float=0, y_coord: float=0):  
         self.name = f'N_{name}'
         self.in_edges = list()
@@ -105,11 +115,16 @@ class Node:
     def __hash__(self) -> str:
         return hash(self.name)
 
+    def __setstate__(self, state) -> None:
+        _set_slots_state(self, state)
+
 class GeoNode(Node):
     """
     Node class to represent a node in a graph
     :param value: value to identify of the node   
     """
+    __slots__ = ()
+
     def __init__(self, name: str, x_coord: float=0, y_coord: float=0):        
         super().__init__(name)
         self.x_coord = x_coord
@@ -127,6 +142,10 @@ class GeoNode(Node):
     def __eq__(self, other) -> bool:
         return self.name == other.name
 
+    def __hash__(self) -> int:
+        # Defining __eq__ drops the inherited __hash__, GeoNodes are stored in sets too
+        return hash(self.name)
+
     
 @dataclass
 class Edge:
@@ -144,6 +163,8 @@ class Edge:
         >>> edge = Edge(node1, node2, 10) # Weigth of 10
         >>> edge_without_weigth = Edge(node1, node2) # Weigth of 1 as default
     """
+    __slots__ = ("weigth", "node_from", "node_to", "alter_color")
+
     def __init__(self, node_from: Node, node_to: Node, weigth: int=1):
         self.weigth = weigth
         self.node_from = node_from
@@ -208,6 +229,9 @@ class Edge:
     def __eq__(self, other) -> bool:
         return (self.node_from.name == other.node_from.name and self.node_to.name == other.node_to.name) or (self.node_from.name == other.node_to.name and self.node_to.name == other.node_from.name)
 
+    def __setstate__(self, state) -> None:
+        _set_slots_state(self, state)
+
 @dataclass
 class DirectedEdge(Edge):
     """
@@ -217,6 +241,8 @@ class DirectedEdge(Edge):
         node_to (Node): ending node of the edge
         weigth (int): weigth of the edge
     """
+    __slots__ = ()
+
     def __init__(self, node_from: Node, node_to: Node, weigth: int=1):
         super().__init__(node_from, node_to, weigth)
 
@@ -229,6 +255,18 @@ class DirectedEdge(Edge):
     def __eq__(self, other) -> bool:
         return self.node_from.name == other.node_from.name and self.node_to.name == other.node_to.name
 
+def _set_slots_state(instance, state) -> None:
+    """
+    Restore the attributes of a pickled Node or Edge. Accepts the (dict, slots)
+    state of the current classes and the plain dict pickled before they had __slots__
+    """
+    if isinstance(state, tuple):
+        dict_state, slots_state = state
+        state = {**(dict_state or {}), **(slots_state or {})}
+    for attribute, value in state.items():
+        setattr(instance, attribute, value)
+
+
 class Graph:
     """
     Graph class to represent a graph with a 
@@ -261,22 +299,112 @@ class Graph:
             edges = []
         self.nodes = nodes
         self.edges = edges
-    
-    def add_node(self, node: Node) -> None:
+        self._build_node_index()
+        self._build_edge_index()
+        # Snapshot returned by freeze(), dropped whenever the graph changes
+        self._frozen = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_frozen"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        # Graphs pickled before the indexes existed need them rebuilt on load
+        self.__dict__.update(state)
+        self._frozen = None
+        if "_node_index" not in state:
+            self._build_node_index()
+        if "_edge_index" not in state:
+            self._build_edge_index()
+
+    def _build_node_index(self) -> None:
         """
-        Insert a node to the list of nodes in the graph.
-        Warning: of deprecation Use this methods carefully as it does not check if the node is already in the graph
-        Neither connects the node to the graph by adding the edges to the node
+        Build the index that maps the name of every node to the node stored in the graph
+        """
+        self._node_index = {node.name: node for node in self.nodes}
+
+    def _build_edge_index(self) -> None:
+        """
+        Build the index that maps the canonical key of every edge
+        to its position in the list of edges
+        """
+        self._edge_index = dict()
+        for position, edge in enumerate(self.edges):
+            self._edge_index[self._edge_key(edge.node_from, edge.node_to)] = position
+
+    def _edge_key(self, from_node, to_node) -> tuple:
+        """
+        Return the canonical key of an edge, built from the names of its nodes.
+        Directed graphs use the ordered pair, undirected graphs the sorted pair
+        so (A, B) and (B, A) are the same edge.
+        Args:
+            from_node (Node | str): starting node of the edge or its name
+            to_node (Node | str): ending node of the edge or its name
+        Returns:
+            tuple: key of the edge
+        """
+        from_name = from_node if isinstance(from_node, str) else from_node.name
+        to_name = to_node if isinstance(to_node, str) else to_node.name
+        if self.is_directed or from_name <= to_name:
+            return (from_name, to_name)
+        return (to_name, from_name)
+
+    def add_node(self, node: Node) -> Node:
+        """
+        Insert a node to the set of nodes in the graph, if there is no node with the same name.
+        It does not connect the node to the graph by adding the edges to the node
         Args:
             node (Node): node to be added to the graph
         Returns:
-            None
+            Node: node stored in the graph with the name of the given node
         Examples:
             >>> graph = Graph()
             >>> node1 = Node('A')
             >>> graph.add_node(node1)
         """
-        self.nodes.add(node)
+        stored_node = self._node_index.get(node.name)
+        if stored_node is None:
+            self._node_index[node.name] = node
+            self.nodes.add(node)
+            self._frozen = None
+            stored_node = node
+        return stored_node
+
+    def get_node(self, name: str) -> Node:
+        """
+        Return the node of the graph with the given name, or None if there is no such node
+        Args:
+            name (str): name of the node, as in node.name (e.g. 'N_0')
+        Returns:
+            Node: node stored in the graph
+        """
+        return self._node_index.get(name)
+
+    def get_or_create_node(self, name: str, node_class: type = Node, **kwargs) -> Node:
+        """
+        Return the node of the graph with the given name, as get_node does,
+        creating and adding it to the graph if it does not exist yet
+        Args:
+            name (str): name of the node, as in node.name (e.g. 'N_0'). New nodes keep it
+                as given, names read from other sources (e.g. 'alpha') get no 'N_' prefix
+            node_class (type): class used to create the node, Node by default
+            kwargs: extra arguments for the node constructor, like the coordinates of a GeoNode
+        Returns:
+            Node: node stored in the graph
+        Examples:
+            >>> graph = Graph()
+            >>> node = graph.get_or_create_node('N_0')
+            >>> graph.get_node('N_0') is node
+            True
+        """
+        stored_node = self._node_index.get(name)
+        if stored_node is None:
+            node = node_class(name, **kwargs)
+            # The constructor adds the 'N_' prefix to its argument
+            node.name = name
+            stored_node = self.add_node(node)
+        return stored_node
         
     def get_nodes(self) -> list:
         """
@@ -313,16 +441,174 @@ class Graph:
             # self.add_node(from_node)
             return
 
-        edge_class = DirectedEdge if self.is_directed else Edge
-        edge = edge_class(from_node, to_node, int(weight))
+        # Check if the edge is already in the graph using the edge index,
+        # the key follows the same rules as the __eq__ method of the Edge classes
+        key = self._edge_key(from_node, to_node)
+        if PROFILER.enabled:
+            PROFILER.count("graph.duplicate_checks")
+            PROFILER.count("graph.edges_inserted", key not in self._edge_index)
+        if key not in self._edge_index:
+            # Connect the nodes already stored in the graph, looked up by name
+            from_node = self.add_node(from_node)
+            to_node = self.add_node(to_node)
+            edge_class = DirectedEdge if self.is_directed else Edge
+            edge = edge_class(from_node, to_node, int(weight))
+            edge.add_to_nodes()
+            self._edge_index[key] = len(self.edges)
+            self.edges.append(edge)
+            self._frozen = None
 
-        # Check if the edge is already in the list of edges
-        # We override the __eq__ method in the Edge class to compare the nodes of the edge
-        if edge not in self.edges:
-            self.add_node(from_node)
-            self.add_node(to_node)
+    def add_edges(self, edges) -> int:
+        """
+        Insert many edges at once, with the same rules as add_edge for each one
+        but without the per call overhead. Meant for generators and loaders
+        that produce the edges in bulk
+        Args:
+            edges (iterable): (from_node, to_node) or (from_node, to_node, weight) tuples
+        Returns:
+            int: number of edges inserted, without counting duplicates and loops
+        Examples:
+            >>> graph = Graph()
+            >>> node1, node2, node3 = Node('A'), Node('B'), Node('C')
+            >>> graph.add_edges([(node1, node2), (node2, node3, 5)])
+            2
+        """
+        edge_class = DirectedEdge if self.is_directed else Edge
+        edge_index, add_node = self._edge_index, self.add_node
+        edge_key = PROFILER.counting(self._edge_key, "graph.duplicate_checks")
+        inserted = 0
+        for from_node, to_node, *weight in edges:
+            if from_node is None or to_node is None or from_node == to_node:
+                continue
+            key = edge_key(from_node, to_node)
+            if key in edge_index:
+                continue
+            edge = edge_class(add_node(from_node), add_node(to_node), int(weight[0]) if weight else 1)
             edge.add_to_nodes()
+            edge_index[key] = len(self.edges)
             self.edges.append(edge)
+            inserted += 1
+        if inserted:
+            self._frozen = None
+        if PROFILER.enabled:
+            PROFILER.count("graph.edges_inserted", inserted)
+        return inserted
+
+    @classmethod
+    @PROFILER.profiled("graph.from_edge_arrays")
+    def from_edge_arrays(cls,
+                         names: list,
+                         sources,
+                         targets,
+                         weights=None,
+                         is_directed: bool = False,
+                         name: str = "GenericGraph",
+                         colored=()) -> 'Graph':
+        """
+        Build a graph from parallel arrays of edges over integer node ids, as
+        FrozenGraph.from_edge_arrays does. Nodes are created once per id, so
+        loaders only have to map each name to an id
+        Args:
+            names (list): name of each node by integer id (e.g. 'N_0')
+            sources (sequence): integer id of the starting node of each edge
+            targets (sequence): integer id of the ending node of each edge
+            weights (sequence): weight of each edge, 1 for every edge by default
+            is_directed (bool): flag to indicate if the graph is directed
+            name (str): name of the graph
+            colored (iterable): positions in the arrays of the edges to mark with alter_color
+        Returns:
+            Graph: new graph, without loops nor repeated edges
+        Examples:
+            >>> graph = Graph.from_edge_arrays(['N_0', 'N_1', 'N_2'], [0, 1], [1, 2], [4, 7])
+            >>> graph.get_edge('N_2', 'N_1').weigth
+            7
+        """
+        graph = cls(is_directed=is_directed, name=name)
+        nodes = [graph.get_or_create_node(node_name) for node_name in names]
+        node_names = [node.name for node in nodes]
+        edge_class = DirectedEdge if is_directed else Edge
+        edge_index, edges = graph._edge_index, graph.edges
+        if weights is None:
+            weights = [1] * len(sources)
+        for source, target, weight in zip(sources, targets, weights):
+            if source == target:
+                continue
+            source_name, target_name = node_names[source], node_names[target]
+            if is_directed or source_name <= target_name:
+                key = (source_name, target_name)
+            else:
+                key = (target_name, source_name)
+            if key in edge_index:
+                continue
+            source_node, target_node = nodes[source], nodes[target]
+            edge = edge_class(source_node, target_node, weight)
+            # Same as edge.add_to_nodes(), without two method calls per edge
+            source_node.out_edges.append(edge)
+            target_node.in_edges.append(edge)
+            edge_index[key] = len(edges)
+            edges.append(edge)
+        for position in colored:
+            key = graph._edge_key(node_names[sources[position]], node_names[targets[position]])
+            if key in edge_index:
+                edges[edge_index[key]].alter_color = True
+        if PROFILER.enabled:
+            PROFILER.count("graph.edges_inserted", len(edges))
+        return graph
+
+    def has_edge(self, from_node, to_node) -> bool:
+        """
+        Check if the graph has an edge between two nodes.
+        In undirected graphs the order of the nodes does not matter
+        Args:
+            from_node (Node | str): starting node of the edge or its name
+            to_node (Node | str): ending node of the edge or its name
+        Returns:
+            bool: True if the edge is in the graph
+        Examples:
+            >>> graph = Graph()
+            >>> graph.add_edge(Node('A'), Node('B'))
+            >>> graph.has_edge('N_B', 'N_A')
+            True
+        """
+        return self._edge_key(from_node, to_node) in self._edge_index
+
+    def get_edge(self, from_node, to_node) -> Edge:
+        """
+        Return the edge between two nodes, or None if there is no such edge
+        Args:
+            from_node (Node | str): starting node of the edge or its name
+            to_node (Node | str): ending node of the edge or its name
+        Returns:
+            Edge: edge stored in the graph
+        """
+        position = self._edge_index.get(self._edge_key(from_node, to_node))
+        if position is None:
+            return None
+        return self.edges[position]
+
+    def remove_edge(self, from_node, to_node) -> Edge:
+        """
+        Remove the edge between two nodes from the graph and from its nodes.
+        The last edge of the list takes the place of the removed one,
+        so the order of the list of edges is not preserved
+        Args:
+            from_node (Node | str): starting node of the edge or its name
+            to_node (Node | str): ending node of the edge or its name
+        Returns:
+            Edge: removed edge, or None if there was no such edge
+        """
+        position = self._edge_index.pop(self._edge_key(from_node, to_node), None)
+        if position is None:
+            return None
+        edge = self.edges[position]
+        last_edge = self.edges.pop()
+        if position < len(self.edges):
+            self.edges[position] = last_edge
+            self._edge_index[self._edge_key(last_edge.node_from, last_edge.node_to)] = position
+        edge.node_from.out_edges.remove(edge)
+        edge.node_to.in_edges.remove(edge)
+        self._frozen = None
+        return edge
         
     def add_validated_edge(self, from_node: Node, to_node: Node, weight: int= 1) -> None:
         """
@@ -352,378 +638,227 @@ class Graph:
             # self.add_node(from_node)
             return
 
-        if from_node in self.nodes:
-            from_node = [node for node in self.nodes if node.name == from_node.name][0]
-        else:
-            self.add_node(from_node)
-        if to_node in self.nodes:
-            to_node = [node for node in self.nodes if node.name == to_node.name][0]
-        else:
-            self.add_node(to_node)
+        # A repeated edge is skipped as in add_edge, otherwise the index would point to
+        # the new edge and the first one could never be removed
+        key = self._edge_key(from_node, to_node)
+        if key in self._edge_index:
+            return
+
+        # Use the nodes already stored in the graph, looked up by name
+        from_node = self.add_node(from_node)
+        to_node = self.add_node(to_node)
 
         edge_class = DirectedEdge if self.is_directed else Edge
         edge = edge_class(from_node, to_node, int(weight))
-
-        # Check if the edge is already in the list of edges
-        # We override the __eq__ method in the Edge class to compare the nodes of the edge
         edge.add_to_nodes()
+        self._edge_index[key] = len(self.edges)
         self.edges.append(edge)
+        self._frozen = None
     
 
 
-    def save_graphviz_by_node(self) -> str:
+    @PROFILER.profiled("freeze")
+    def freeze(self) -> FrozenGraph:
         """
-        Save the graph to a txt file in graphViz format
+        Return an immutable compressed sparse row snapshot of the graph
+        to run read-only algorithms on integer arrays. Node ids follow
+        the order in which the nodes were added to the graph.
+        The snapshot is kept until the graph changes through its methods,
+        edges or nodes modified directly are not seen by an existing snapshot
+        Returns:
+            FrozenGraph: snapshot of the graph
+        Examples:
+            >>> graph = Graph()
+            >>> graph.add_edge(Node('A'), Node('B'))
+            >>> depth = graph.freeze().bfs('N_A').depth
+        """
+        if self._frozen is not None:
+            return self._frozen
+        names = list(self._node_index)
+        position = {node_name: node_id for node_id, node_name in enumerate(names)}
+        sources = array("i", [0]) * len(self.edges)
+        targets = array("i", [0]) * len(self.edges)
+        weights = array("q", [0]) * len(self.edges)
+        for edge_id, edge in enumerate(self.edges):
+            sources[edge_id] = position[edge.node_from.name]
+            targets[edge_id] = position[edge.node_to.name]
+            weights[edge_id] = edge.weigth
+        self._frozen = FrozenGraph.from_edge_arrays(names, sources, targets, weights,
+                                                    is_directed=self.is_directed, name=self.name)
+        return self._frozen
+
+    def shortest_paths(self, source, target=None) -> ShortestPaths:
+        """
+        Calculate the shortest paths from a source node with the Dijkstra algorithm
+        on a binary heap. The graph is not modified.
+        If a target is given the search stops as soon as the target is reached,
+        then only the distances of the nodes settled before it are final
+        Args:
+            source (Node | str): starting node or its name
+            target (Node | str): node to stop at, or None to reach every node
+        Returns:
+            ShortestPaths: distances and predecessors of the nodes
+        Examples:
+            >>> graph = Graph()
+            >>> graph.add_edge(Node('A'), Node('B'), 3)
+            >>> graph.shortest_paths('N_A').distance_to('N_B')
+            3
         """
-        current_datetime_code = datetime.now().strftime("%Y%m%d%H%M")
-        filename = f"graph_{self.name}_{current_datetime_code}.dot"    
-        fileroute = f"outputs/{filename}"
-        graph_type = "digraph" if self.is_directed else "graph"
-        visited_edges = list()
-        with open(fileroute, "w", encoding="UTF") as file:
-            file.write(f"{graph_type} {self.name}" + "{\n")
-            for node in self.nodes:
-                if node.get_outdegree() > 0:
-                    for edge in node.get_edges():
-                        if edge not in visited_edges:
-                            file.write(edge.__repr__())
-                            visited_edges.append(edge)
-                else:
-                    # file.write(f"{node.name}; \n")
-                    continue
-            file.write("}")
+        return self.freeze().shortest_paths(source, target)
 
-        print(f"Graph saved to {fileroute} ")
-    
-    def save_graphviz_by_edges(self) -> str:
+    def _default_fileroute(self, suffix: str = "") -> str:
         current_datetime_code = datetime.now().strftime("%Y%m%d%H%M")
-        filename = f"graph_{self.name}_{current_datetime_code}.dot"   
-        fileroute = f"outputs/{filename}"
-        graph_type = "digraph" if self.is_directed else "graph"
-        with open(fileroute, "w", encoding="UTF") as file:
-            file.write(f"{graph_type} {self.name}" + "{\n")
-            for edge in self.edges:
-                file.write(edge.__repr__())
-            file.write("}")
+        return f"outputs/graph_{self.name}_{current_datetime_code}{suffix}.dot"
 
+    def save_graphviz_by_node(self, fileroute=None, compress: bool = None) -> str:
+        """
+        Save the graph to a txt file in graphViz format, walking the edges node by node
+        Args:
+            fileroute (str | stream): path or stream to write to,
+                outputs/graph_<name>_<datetime>.dot by default
+            compress (bool): gzip the output, by default only if the path ends in .gz
+        Returns:
+            str: route of the saved file
+        """
+        fileroute = fileroute or self._default_fileroute()
+        write_dot(self, fileroute, by_node=True, compress=compress)
         print(f"Graph saved to {fileroute} ")
+        return fileroute
 
+    def save_graphviz_by_edges(self, fileroute=None, compress: bool = None) -> str:
+        """
+        Save the graph to a txt file in graphViz format, in the order the edges were added
+        Args:
+            fileroute (str | stream): path or stream to write to,
+                outputs/graph_<name>_<datetime>.dot by default
+            compress (bool): gzip the output, by default only if the path ends in .gz
+        Returns:
+            str: route of the saved file
+        """
+        fileroute = fileroute or self._default_fileroute()
+        write_dot(self, fileroute, compress=compress)
+        print(f"Graph saved to {fileroute} ")
+        return fileroute
 
-    def save_graphviz_with_weigth(self, is_dijkstra: bool = False) -> str:
-        current_datetime_code = datetime.now().strftime("%Y%m%d%H%M")
-        if is_dijkstra:
-            filename = f"graph_{self.name}_{current_datetime_code}_dijkstra.dot"
-        else:
-            filename = f"graph_{self.name}_{current_datetime_code}.dot"
-        fileroute = f"outputs/{filename}"
-        graph_type = "digraph" if self.is_directed else "graph"
-        with open(fileroute, "w", encoding="UTF") as file:
-            file.write(f"{graph_type} {self.name}" + "{\n")
-            for edge in self.edges:
-                file.write(edge.print_with_weight())
-            file.write("}")
-
+    def save_graphviz_with_weigth(self, is_dijkstra: bool = False, fileroute=None, compress: bool = None) -> str:
+        """
+        Save the graph to a txt file in graphViz format with the weights as labels,
+        and the edges with alter_color in red
+        Args:
+            is_dijkstra (bool): add _dijkstra to the default file name
+            fileroute (str | stream): path or stream to write to,
+                outputs/graph_<name>_<datetime>.dot by default
+            compress (bool): gzip the output, by default only if the path ends in .gz
+        Returns:
+            str: route of the saved file
+        """
+        fileroute = fileroute or self._default_fileroute("_dijkstra" if is_dijkstra else "")
+        write_dot(self, fileroute, with_weight=True, compress=compress)
         print(f"Graph saved to {fileroute} ")
+        return fileroute
 
-    
-    
     def __str__(self):
         for edge in self.edges:
             return edge.__repr__()
 
 
-    def get_bfs_tree(self) -> 'Graph':
+    def get_bfs_tree(self, source=None) -> 'Graph':
         """
         Calculate the breadth first search tree of the graph given an starting node
         Identified by name, to ease the use of the function
  
         - Args:
-            - self.nodes: set of nodes in the graph
+            - source (Node | str): starting node or its name. By default N_0,
+              or the first node added to the graph if there is no N_0
             
         - Returns:
             - Graph: graph with the BFS tree
         """
-        # Get the first node of the graph
-        starting_node = [node for node in list(self.nodes) if node.name == 'N_0']
-        if not starting_node:
-            starting_node = list(self.nodes)[0]
-        else:
-            starting_node = starting_node[0]
-            
-        bfs_tree = Graph(name=f"BFS_{self.name}")
-        visited = set()
-        queue = list()
-        queue.append(starting_node)
-        
-        while queue:
-            current_node = queue.pop(0)
-            visited.add(current_node)
-            for edge in current_node.get_edges():
-                connected_node = edge.get_connected_node(current_node)
-                if connected_node not in visited:
-                    queue.append(connected_node)
-                    bfs_tree.add_edge(current_node, connected_node)
-                    visited.add(connected_node)
-        return bfs_tree
+        if source is None:
+            source = "N_0" if "N_0" in self._node_index else next(iter(self._node_index))
+        return self.freeze().bfs(source).to_graph(f"BFS_{self.name}")
     
     def get_dfs_recursive(self, starting_node_index: int = 0) -> 'Graph':
         """
         Calculate the depth first search tree of the graph given an starting node
-        Identified by name, to ease the use of the function
-        If not starting_node_name is given, then starting node will be the first element of the list of nodes.
-        Also can be given the index of the starting node in the list of nodes and that 
-        will be the starting node.
+        visiting the nodes in the order of a recursive search. It runs on an explicit
+        stack, so it does not hit the recursion limit on long paths or large meshes.
+        The starting node is given by its index in the order the nodes were added
+        to the graph, the first node by default.
         Args:
-            starting_node_name (str): name of the starting node
             starting_node_index (int): index of the starting node
         Returns:
             Graph: graph with the DFS tree
         """
-        starting_node = list(self.nodes)[starting_node_index]
-        dfs_tree = Graph(name=f"DFS_R_{self.name}")
-        visited = set()
-        def dfs_recursive(node):
-            visited.add(node)
-            dfs_tree.add_node(node)
-            for edge in node.get_edges():
-                connected_node = edge.get_connected_node(node)
-                if connected_node not in visited:
-                    dfs_tree.add_edge(node, connected_node)
-                    dfs_recursive(connected_node)
-        dfs_recursive(starting_node)
-        return dfs_tree
+        return self.freeze().dfs(starting_node_index, DFS_RECURSIVE).to_graph(f"DFS_R_{self.name}")
     
     def get_dfs_iterative(self, starting_node_index: int = 0) -> 'Graph':
         """
         Calculate the depth first search tree of the graph given an starting node
-        Identified by name, to ease the use of the function
-        If not starting_node_name is given, then starting node will be the first element of the list of nodes.
-        Also can be given the index of the starting node in the list of nodes and that 
-        will be the starting node.
+        with a stack: every unvisited neighbor of a node is marked and pushed at once,
+        and the last one pushed is visited first.
+        The starting node is given by its index in the order the nodes were added
+        to the graph, the first node by default.
         Args:
-            starting_node_name (str): name of the starting node
             starting_node_index (int): index of the starting node
         Returns:
             Graph: graph with the DFS tree
         """
-        starting_node = list(self.nodes)[starting_node_index]
-            
-        dfs_tree = Graph(name=f"DFS_I_{self.name}")
-        visited = set()
-        stack = list()
-        stack.append(starting_node)
-        while stack:
-            current_node = stack.pop()
-            visited.add(current_node)
-            for edge in current_node.get_edges():
-                connected_node = edge.get_connected_node(current_node)
-                if connected_node not in visited:
-                    stack.append(connected_node)
-                    dfs_tree.add_edge(current_node, connected_node)
-                    visited.add(connected_node)
-
-        return dfs_tree
+        return self.freeze().dfs(starting_node_index, DFS_STACK).to_graph(f"DFS_I_{self.name}")
 
 
-    def get_dijkstra(self, as_color_tree:bool = True) -> None:
+    def get_dijkstra(self, as_color_tree:bool = True, source=None) -> ShortestPaths:
         """
         Calculate the shortest path tree of the graph given an starting node
         The path will be calculated using the Dijkstra algorithm
-        and can either mark the tree as a set of edges with color altered
-        or as a new Graph with the shortest path tree
-        """
-        # Create visited nodes list
-        visited = set()
-        # Create the shortest path tree
-        shortest_path_tree = dict()
-        set_of_minimun_edges = list()
-        
-        for node in self.nodes:
-            shortest_path_tree[node] = (None, float('inf'))
-        
-        # Set starting node updating its distance to 0
-        shortest_path_tree[list(self.nodes)[0]] = (None, 0)
-        
-        while len(visited) < len(self.nodes):
-            # Get the node with the minimum distance
-            current_node = min((node for node in self.nodes if node not in visited), key=lambda x: shortest_path_tree[x][1])
-            visited.add(current_node)
-            
-            for edge in current_node.get_edges():
-                connected_node = edge.get_connected_node(current_node)
-                if connected_node not in visited:
-                    distance = shortest_path_tree[current_node][1] + edge.weigth
-                    if distance < shortest_path_tree[connected_node][1]:
-                        shortest_path_tree[connected_node] = (current_node, distance)
-
-                        for prev_edge in connected_node.get_edges():
-                            prev_edge.alter_color = False
-    
-                        if edge not in set_of_minimun_edges:
-                            set_of_minimun_edges.append(edge)
-                            edge.alter_color = True
-                        
-        
-        # Update node name and add sufix to the node name with the distance
-        for node in self.nodes:
-            node.name = f"{node.name}_{shortest_path_tree[node][1]}"
-        # Create a new graph with the shortest path tree
-        # shortest_path_tree_graph = Graph(name=f"Only_tree_Dijkstra_{self.name}")
-        
-        # for edge in set_of_minimun_edges:
-        #     shortest_path_tree_graph.add_edge(edge.node_from, edge.node_to, edge.weigth)
-        # shortest_path_tree_graph.save_graphviz_with_weigth()
+        and can mark the tree as a set of edges with color altered,
+        ready to be saved with save_graphviz_with_weigth(is_dijkstra=True)
+        Args:
+            as_color_tree (bool): mark the edges of the tree with alter_color
+            source (Node | str): starting node, the first node added to the graph by default
+        Returns:
+            ShortestPaths: distances and predecessors of the nodes
+        """
+        if source is None:
+            source = next(iter(self._node_index))
+        shortest_paths = self.shortest_paths(source)
+        if as_color_tree:
+            shortest_paths.color_tree(self)
+        return shortest_paths
         
-    def get_MST_by_kruskal_direct(self) -> None:
+    def get_MST_by_kruskal_direct(self) -> MSTResult:
         """
-        Calculate the minimum spanning tree of the graph given an starting node
-        The path will be calculated using the Kruskal algorithm
+        Calculate the minimum spanning tree of the graph
+        The tree will be calculated using the Kruskal algorithm with a union-find structure
+        Returns:
+            MSTResult: edges and total weight of the tree, use its to_graph method to save it
+        Examples:
+            >>> mst = graph.get_MST_by_kruskal_direct()
+            >>> mst.total_weight
+            >>> mst.to_graph().save_graphviz_with_weigth()
         """
-        # Create visited nodes list
-        visited = set()
-        # Create the shortest path tree
-        set_of_minimun_edges = list()
-        # Create the set of sets to keep track of the connected components
-        connected_components = set()
-        
-        for node in self.nodes:
-            connected_components.add(frozenset([node]))
+        return mst.kruskal(self.freeze(), name=f"MST_Kruskal_{self.name}")
         
-        # Create a list of edges
-        list_of_edges = list(self.edges)
-        # Sort the list of edges by weight
-        list_of_edges.sort(key=lambda x: x.weigth)
-        
-        while len(connected_components) > 1 and list_of_edges != []:
-            # Get the edge with the minimum weight
-            edge = list_of_edges.pop(0)
-            # Get the connected nodes of the edge
-            node_from, node_to = edge.get_nodes()
-            # Get the connected components of the nodes
-            component_from = None
-            component_to = None
-            for component in connected_components:
-                if node_from in component:
-                    component_from = component
-                if node_to in component:
-                    component_to = component
-            # If the nodes are in different components, add the edge to the minimum spanning tree
-            if component_from != component_to:
-                set_of_minimun_edges.append(edge)
-                connected_components.remove(component_from)
-                connected_components.remove(component_to)
-                connected_components.add(component_from.union(component_to))
-        
-        # Create a new graph with the minimum spanning tree
-        minimum_spanning_tree = Graph(name=f"MST_Kruskal_{self.name}")
-        
-        for edge in set_of_minimun_edges:
-            minimum_spanning_tree.add_edge(edge.node_from, edge.node_to, edge.weigth)
-        # Print value of mst:
-        mst_weight = sum([edge.weigth for edge in set_of_minimun_edges])
-        print("---------------------------------------")
-        print(f"Direct Kruskal MST value: {mst_weight}")
-        minimum_spanning_tree.save_graphviz_with_weigth()
-        
-    def get_MST_by_kruskal_inverse(self) -> None:
+    def get_MST_by_kruskal_inverse(self) -> MSTResult:
         """
-        Calculate the minimum spanning tree of the graph given an starting node
-        The path will be calculated using the Kruskal algorithm
+        Calculate the minimum spanning tree of the graph
+        The tree will be calculated using the reverse-delete (inverse Kruskal) algorithm,
+        removing the heaviest edges as long as the graph stays connected
+        Returns:
+            MSTResult: edges and total weight of the tree, use its to_graph method to save it
         """
-        # Create visited nodes list
-        visited = set()
-        # Create the shortest path tree
-        set_of_minimun_edges = list()
-        # Create the set of sets to keep track of the connected components
-        connected_components = set()
-        
-        for node in self.nodes:
-            connected_components.add(frozenset([node]))
-        
-        # Create a list of edges
-        list_of_edges = list(self.edges)
-        # Sort the list of edges by weight
-        list_of_edges.sort(key=lambda x: x.weigth, reverse=True)
-        
-        while len(connected_components) > 1 and list_of_edges != []:
-            # Get the edge with the minimum weight
-            edge = list_of_edges.pop(0)
-            # Get the connected nodes of the edge
-            node_from, node_to = edge.get_nodes()
-            # Get the connected components of the nodes
-            component_from = None
-            component_to = None
-            for component in connected_components:
-                if node_from in component:
-                    component_from = component
-                if node_to in component:
-                    component_to = component
-            # If the nodes are in different components, add the edge to the minimum spanning tree
-            if component_from != component_to:
-                set_of_minimun_edges.append(edge)
-                connected_components.remove(component_from)
-                connected_components.remove(component_to)
-                connected_components.add(component_from.union(component_to))
-        
-        # Create a new graph with the minimum spanning tree
-        minimum_spanning_tree = Graph(name=f"MST_Kruskal_Inverse{self.name}")
+        return mst.reverse_delete(self.freeze(), name=f"MST_Kruskal_Inverse{self.name}")
         
-        for edge in set_of_minimun_edges:
-            minimum_spanning_tree.add_edge(edge.node_from, edge.node_to, edge.weigth)
-        # Print value of mst:
-        mst_weight = sum([edge.weigth for edge in set_of_minimun_edges])
-        print("---------------------------------------")
-        print(f"Inverse Kruskal MST value: {mst_weight}")
-        minimum_spanning_tree.save_graphviz_with_weigth()
-        
-        
-    def get_mst_by_prim_algorithm(self) -> None:
+    def get_mst_by_prim_algorithm(self, eager: bool = True, root=None) -> MSTResult:
         """
-        Calculate the minimum spanning tree of the graph given an starting node
-        The path will be calculated using the Prim algorithm
+        Calculate the minimum spanning tree of the graph growing it from a root node
+        The tree will be calculated using the Prim algorithm
+        Args:
+            eager (bool): use the indexed heap variant, O(E log V), better for dense graphs.
+                If False use the lazy variant, O(E log E), usually faster on sparse graphs
+            root (Node | str): node to grow the tree from, the first node added to the graph by default
+        Returns:
+            MSTResult: edges and total weight of the tree, use its to_graph method to save it
         """
-        # Create visited nodes list
-        visited = set()
-        # Create the shortest path tree
-        set_of_minimun_edges = list()
-        # Create the set of sets to keep track of the connected components
-        connected_components = set()
-        
-        for node in self.nodes:
-            connected_components.add(frozenset([node]))
-        
-        # Create a list of edges
-        list_of_edges = list(self.edges)
-        # Sort the list of edges by weight
-        list_of_edges.sort(key=lambda x: x.weigth)
-        
-        while len(connected_components) > 1 and list_of_edges != []:
-            # Get the edge with the minimum weight
-            edge = list_of_edges.pop(0)
-            # Get the connected nodes of the edge
-            node_from, node_to = edge.get_nodes()
-            # Get the connected components of the nodes
-            component_from = None
-            component_to = None
-            for component in connected_components:
-                if node_from in component:
-                    component_from = component
-                if node_to in component:
-                    component_to = component
-            # If the nodes are in different components, add the edge to the minimum spanning tree
-            if component_from != component_to:
-                set_of_minimun_edges.append(edge)
-                connected_components.remove(component_from)
-                connected_components.remove(component_to)
-                connected_components.add(component_from.union(component_to))
-        
-        # Create a new graph with the minimum spanning tree
-        minimum_spanning_tree = Graph(name=f"MST_Prim_{self.name}")
-        
-        for edge in set_of_minimun_edges:
-            minimum_spanning_tree.add_edge(edge.node_from, edge.node_to, edge.weigth)
-        # Print value of mst:
-        mst_weight = sum([edge.weigth for edge in set_of_minimun_edges])
-        print("---------------------------------------")
-        print(f"Prim MST value: {mst_weight}")
-        minimum_spanning_tree.save_graphviz_with_weigth()
\ No newline at end of file
+        prim = mst.prim_eager if eager else mst.prim_lazy
+        return prim(self.freeze(), root=0 if root is None else root, name=f"MST_Prim_{self.name}")
@@ -0,0 +1,204 @@
+"""
+Implicit mesh graph, with neighbors computed on demand
+"""
+from array import array
+
+from models.csr import FrozenGraph, IndexedGraph
+
+
+class MeshNames:
+    """
+    Read-only sequence with the names of the nodes of a MeshGraph,
+    built when they are asked for instead of stored
+    """
+    __slots__ = ("m", "n")
+
+    def __init__(self, m: int, n: int):
+        self.m = m
+        self.n = n
+
+    def __len__(self) -> int:
+        return self.m * self.n
+
+    def __getitem__(self, node_id: int) -> str:
+        if node_id < 0:
+            node_id += len(self)
+        if not 0 <= node_id < len(self):
+            raise IndexError(f"Node id {node_id} out of range")
+        column, row = divmod(node_id, self.n)
+        return f"N_{column + 1}_{row + 1}"
+
+    def __iter__(self):
+        for column in range(self.m):
+            for row in range(self.n):
+                yield f"N_{column + 1}_{row + 1}"
+
+
+class MeshGraph(IndexedGraph):
+    """
+    Mesh of m columns and n rows that stores no nodes nor edges: node
+    column * n + row is named N_<column + 1>_<row + 1> and its neighbors,
+    degree and edge weights are calculated when needed. It runs the
+    algorithms of IndexedGraph (bfs, dfs, shortest_paths) directly, and
+    freeze() turns it into a FrozenGraph when a stored copy is needed.
+    Directed meshes only have the edges to the next row and to the next column,
+    as mesh_random_graph generates them. Meshes have a long diameter and small
+    frontiers, so their bfs is top-down unless direction_optimizing is asked for.
+
+    - Attributes:
+        - m (int): number of columns
+        - n (int): number of rows
+        - is_directed (bool): flag to indicate if the graph is directed
+        - name (str): name of the graph
+        - max_weight (int): edges weigh 1 if it is 1, else a pseudo random
+          weight between 1 and max_weight that depends only on the edge and the seed
+        - seed (int): seed of the edge weights
+
+    - Examples:
+
+        >>> mesh = MeshGraph(2000, 2000, max_weight=100)
+        >>> mesh.shortest_paths('N_1_1', target='N_2000_2000').distance_to('N_2000_2000')
+    """
+    __slots__ = ("m", "n", "is_directed", "name", "max_weight", "seed", "names", "_reversed")
+
+    def __init__(self,
+                 m: int,
+                 n: int,
+                 is_directed: bool = False,
+                 name: str = "",
+                 max_weight: int = 1,
+                 seed: int = 0,
+                 _reversed: bool = False):
+        if m < 1 or n < 1:
+            raise ValueError("m and n must be at least 1")
+        self.m = m
+        self.n = n
+        self.is_directed = is_directed
+        self.name = name or f"Mesh_{m}x{n}"
+        self.max_weight = max_weight
+        self.seed = seed
+        self.names = MeshNames(m, n)
+        # Set on the transpose of a directed mesh, where edges go to the previous row and column
+        self._reversed = _reversed
+
+    @property
+    def num_nodes(self) -> int:
+        """
+        Return the number of nodes of the mesh
+        """
+        return self.m * self.n
+
+    @property
+    def num_edges(self) -> int:
+        """
+        Return the number of edges of the mesh, each undirected edge counted once
+        """
+        return self.m * (self.n - 1) + (self.m - 1) * self.n
+
+    def index_of(self, node) -> int:
+        """
+        Return the integer id of a node
+        Args:
+            node (int | str | Node): integer id, name (N_<column>_<row>) or node
+        Returns:
+            int: integer id of the node
+        """
+        if isinstance(node, int):
+            if not 0 <= node < self.num_nodes:
+                raise IndexError(f"Node id {node} out of range")
+            return node
+        node_name = node if isinstance(node, str) else node.name
+        try:
+            prefix, column, row = node_name.split("_")
+            column, row = int(column) - 1, int(row) - 1
+        except ValueError:
+            raise KeyError(f"Node {node_name} not found in {self.name}") from None
+        if prefix != "N" or not (0 <= column < self.m and 0 <= row < self.n):
+            raise KeyError(f"Node {node_name} not found in {self.name}")
+        return column * self.n + row
+
+    def neighbors(self, node_id: int) -> list:
+        """
+        Return the integer ids of the nodes reached by the edges of a node
+        """
+        n = self.n
+        column, row = divmod(node_id, n)
+        result = []
+        if not self.is_directed or self._reversed:
+            if column > 0:
+                result.append(node_id - n)
+            if row > 0:
+                result.append(node_id - 1)
+        if not self.is_directed or not self._reversed:
+            if row + 1 < n:
+                result.append(node_id + 1)
+            if column + 1 < self.m:
+                result.append(node_id + n)
+        return result
+
+    def weight(self, node_a: int, node_b: int) -> int:
+        """
+        Return the weight of the edge between two neighbor nodes, the same in both directions
+        """
+        if self.max_weight == 1:
+            return 1
+        if node_b < node_a:
+            node_a, node_b = node_b, node_a
+        # Hashes of int tuples do not change between runs, unlike the ones of strings
+        return 1 + hash((self.seed, node_a, node_b)) % self.max_weight
+
+    def weighted_neighbors(self, node_id: int) -> list:
+        """
+        Return pairs (neighbor id, edge weight) for the edges of a node
+        """
+        return [(neighbor, self.weight(node_id, neighbor)) for neighbor in self.neighbors(node_id)]
+
+    def degree(self, node_id: int) -> int:
+        """
+        Return the number of edges of a node, the outdegree in directed meshes
+        """
+        column, row = divmod(node_id, self.n)
+        backward = (column > 0) + (row > 0)
+        forward = (row + 1 < self.n) + (column + 1 < self.m)
+        if not self.is_directed:
+            return backward + forward
+        return backward if self._reversed else forward
+
+    def bfs(self, source=0, direction_optimizing: bool = False, alpha: float = 14, beta: float = 24):
+        """
+        Breadth first search, top-down by default: meshes have small frontiers and a long
+        diameter, so bottom-up levels never pay off and counting the frontier edges costs
+        a degree call per node. See IndexedGraph.bfs
+        """
+        return super().bfs(source, direction_optimizing, alpha, beta)
+
+    def transpose(self) -> 'MeshGraph':
+        """
+        Return the mesh with every edge reversed, the mesh itself if it is undirected
+        """
+        if not self.is_directed:
+            return self
+        return MeshGraph(self.m, self.n, is_directed=True, name=self.name, max_weight=self.max_weight,
+                         seed=self.seed, _reversed=not self._reversed)
+
+    def freeze(self) -> FrozenGraph:
+        """
+        Return the mesh stored as a FrozenGraph. The CSR arrays are written
+        node by node in id order, so no sorting is needed
+        """
+        num_nodes = self.num_nodes
+        indptr = array("q", [0]) * (num_nodes + 1)
+        indices = array("i")
+        weights = array("q")
+        for node_id in range(num_nodes):
+            neighbors = self.neighbors(node_id)
+            indices.extend(neighbors)
+            if self.max_weight == 1:
+                weights.extend([1] * len(neighbors))
+            else:
+                weights.extend([self.weight(node_id, neighbor) for neighbor in neighbors])
+            indptr[node_id + 1] = len(indices)
+        return FrozenGraph(self.names, indptr, indices, weights, is_directed=self.is_directed, name=self.name)
+
+    def __repr__(self) -> str:
+        return f"MeshGraph({self.name}, nodes={self.num_nodes}, edges={self.num_edges})"
@@ -0,0 +1,454 @@
+"""
+Minimum spanning tree algorithms over the CSR snapshot of a graph
+"""
+from array import array
+from dataclasses import dataclass, field
+import heapq
+
+from models.csr import FrozenGraph
+from models.profiling import PROFILER
+
+
+class DisjointSet:
+    """
+    Union-find structure over the integers range(size), with union by rank
+    and path compression so each operation is almost O(1) amortized
+
+    Examples:
+        >>> components = DisjointSet(3)
+        >>> components.union(0, 1)
+        True
+        >>> components.find(1) == components.find(0)
+        True
+    """
+    __slots__ = ("parent", "rank", "count")
+
+    def __init__(self, size: int):
+        self.parent = array("i", range(size))
+        self.rank = bytearray(size)
+        self.count = size
+
+    def find(self, item: int) -> int:
+        """
+        Return the representative of the set that contains item
+        """
+        parent = self.parent
+        root = item
+        while parent[root] != root:
+            root = parent[root]
+        # Path compression, every node in the path now points to the root
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def union(self, item_a: int, item_b: int) -> bool:
+        """
+        Join the sets that contain item_a and item_b
+        Returns:
+            bool: False if both items were already in the same set
+        """
+        root_a, root_b = self.find(item_a), self.find(item_b)
+        if root_a == root_b:
+            return False
+        rank = self.rank
+        if rank[root_a] < rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        if rank[root_a] == rank[root_b]:
+            rank[root_a] += 1
+        self.count -= 1
+        return True
+
+
+class IndexedMinHeap:
+    """
+    Binary min heap over the integers range(size) that keeps the position
+    of each item, so the key of an item in the heap can be decreased in O(log n)
+
+    Examples:
+        >>> heap = IndexedMinHeap(3)
+        >>> heap.push_or_decrease(2, 10)
+        True
+        >>> heap.push_or_decrease(2, 4)
+        True
+        >>> heap.pop()
+        (2, 4)
+    """
+    __slots__ = ("keys", "heap", "position")
+
+    def __init__(self, size: int):
+        self.keys = [None] * size
+        self.heap = list()
+        self.position = array("i", [-1]) * size
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    def __contains__(self, item: int) -> bool:
+        return self.position[item] >= 0
+
+    def push_or_decrease(self, item: int, key) -> bool:
+        """
+        Insert item with the given key, or lower its key if it is already in the heap
+        Returns:
+            bool: False if the item was in the heap with a key lower or equal to the given one
+        """
+        if self.position[item] < 0:
+            self.keys[item] = key
+            self.position[item] = len(self.heap)
+            self.heap.append(item)
+        elif key < self.keys[item]:
+            self.keys[item] = key
+        else:
+            return False
+        self._sift_up(self.position[item])
+        return True
+
+    def pop(self) -> tuple:
+        """
+        Remove and return the (item, key) with the lowest key
+        """
+        heap, position = self.heap, self.position
+        item = heap[0]
+        last = heap.pop()
+        position[item] = -1
+        if heap:
+            heap[0] = last
+            position[last] = 0
+            self._sift_down(0)
+        return item, self.keys[item]
+
+    def _sift_up(self, index: int) -> None:
+        heap, keys, position = self.heap, self.keys, self.position
+        item = heap[index]
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if keys[item] >= keys[parent]:
+                break
+            heap[index] = parent
+            position[parent] = index
+            index = parent_index
+        heap[index] = item
+        position[item] = index
+
+    def _sift_down(self, index: int) -> None:
+        heap, keys, position = self.heap, self.keys, self.position
+        size = len(heap)
+        item = heap[index]
+        while True:
+            child_index = 2 * index + 1
+            if child_index >= size:
+                break
+            if child_index + 1 < size and keys[heap[child_index + 1]] < keys[heap[child_index]]:
+                child_index += 1
+            child = heap[child_index]
+            if keys[child] >= keys[item]:
+                break
+            heap[index] = child
+            position[child] = index
+            index = child_index
+        heap[index] = item
+        position[item] = index
+
+
+@dataclass
+class MSTResult:
+    """
+    Minimum spanning tree (or forest, if the graph is disconnected) of a graph
+
+    Attributes:
+        name (str): name of the tree
+        algorithm (str): algorithm used to calculate it
+        edges (list): edges of the tree as (node name, node name, weight)
+        total_weight (int): sum of the weights of the edges
+        num_components (int): number of trees in the forest, 1 for connected graphs
+    """
+    name: str
+    algorithm: str
+    edges: list = field(default_factory=list)
+    total_weight: int = 0
+    num_components: int = 1
+
+    def to_graph(self):
+        """
+        Build a Graph with the edges of the tree, ready to be saved with save_graphviz_with_weigth
+        """
+        from models.graph import Graph
+        tree = Graph(name=self.name)
+        for from_name, to_name, weight in self.edges:
+            tree.add_edge(tree.get_or_create_node(from_name), tree.get_or_create_node(to_name), weight)
+        return tree
+
+    def __repr__(self) -> str:
+        return (f"MSTResult({self.name}, algorithm={self.algorithm}, edges={len(self.edges)}, "
+                f"total_weight={self.total_weight})")
+
+
+def _edge_arrays(graph: FrozenGraph) -> tuple:
+    """
+    Return the (sources, targets, weights) arrays of the edges of a snapshot,
+    each undirected edge once
+    """
+    sources, targets, weights = array("i"), array("i"), array("q")
+    for source, target, weight in graph.edges():
+        sources.append(source)
+        targets.append(target)
+        weights.append(weight)
+    return sources, targets, weights
+
+
+@PROFILER.profiled("mst.kruskal")
+def kruskal(graph: FrozenGraph, name: str = None) -> MSTResult:
+    """
+    Calculate the minimum spanning tree with the Kruskal algorithm, taking the
+    edges by increasing weight and joining components with a DisjointSet.
+    Directed graphs are treated as undirected. O(E log E)
+    Args:
+        graph (FrozenGraph): snapshot of the graph
+        name (str): name of the tree, MST_Kruskal_<graph name> by default
+    Returns:
+        MSTResult: minimum spanning tree
+    """
+    sources, targets, weights = _edge_arrays(graph)
+    components = DisjointSet(graph.num_nodes)
+    union = PROFILER.counting(components.union, "kruskal.unions")
+    names = graph.names
+    result = MSTResult(name or f"MST_Kruskal_{graph.name}", "kruskal")
+    for edge_id in sorted(range(len(weights)), key=weights.__getitem__):
+        if components.count == 1:
+            break
+        if union(sources[edge_id], targets[edge_id]):
+            result.edges.append((names[sources[edge_id]], names[targets[edge_id]], weights[edge_id]))
+            result.total_weight += weights[edge_id]
+    result.num_components = components.count
+    return result
+
+
+def _undirected(graph: FrozenGraph) -> FrozenGraph:
+    """
+    Return the snapshot itself if it is undirected, or an undirected copy of it,
+    since Prim needs to reach every edge from both of its nodes
+    """
+    if not graph.is_directed:
+        return graph
+    return FrozenGraph.from_edge_arrays(graph.names, *_edge_arrays(graph), is_directed=False, name=graph.name)
+
+
+@PROFILER.profiled("mst.prim_lazy")
+def prim_lazy(graph: FrozenGraph, root=0, name: str = None) -> MSTResult:
+    """
+    Calculate the minimum spanning tree with the Prim algorithm, growing the tree
+    from a root node. The candidate edges wait in a binary heap and the ones that
+    lead to nodes already in the tree are discarded when popped. O(E log E),
+    a good fit for sparse graphs.
+    Disconnected graphs get a spanning forest, with a new tree grown from each
+    node not reached yet
+    Args:
+        graph (FrozenGraph): snapshot of the graph
+        root (int | str | Node): node to grow the first tree from
+        name (str): name of the tree, MST_Prim_<graph name> by default
+    Returns:
+        MSTResult: minimum spanning tree
+    """
+    graph = _undirected(graph)
+    indptr, indices, weights, names = graph.indptr, graph.indices, graph.weights, graph.names
+    in_tree = bytearray(graph.num_nodes)
+    heappush = PROFILER.counting(heapq.heappush, "prim.heap_pushes")
+    result = MSTResult(name or f"MST_Prim_{graph.name}", "prim_lazy", num_components=0)
+    roots = [graph.index_of(root)] if graph.num_nodes else []
+    roots.extend(range(graph.num_nodes))
+    for tree_root in roots:
+        if in_tree[tree_root]:
+            continue
+        result.num_components += 1
+        in_tree[tree_root] = 1
+        heap = [(weights[slot], tree_root, indices[slot]) for slot in range(indptr[tree_root], indptr[tree_root + 1])]
+        heapq.heapify(heap)
+        while heap:
+            weight, from_node, to_node = heapq.heappop(heap)
+            if in_tree[to_node]:
+                continue
+            in_tree[to_node] = 1
+            result.edges.append((names[from_node], names[to_node], weight))
+            result.total_weight += weight
+            for slot in range(indptr[to_node], indptr[to_node + 1]):
+                if not in_tree[indices[slot]]:
+                    heappush(heap, (weights[slot], to_node, indices[slot]))
+    return result
+
+
+@PROFILER.profiled("mst.prim_eager")
+def prim_eager(graph: FrozenGraph, root=0, name: str = None) -> MSTResult:
+    """
+    Calculate the minimum spanning tree with the Prim algorithm, keeping for each
+    node outside the tree only its lightest edge to the tree in an IndexedMinHeap.
+    The heap never holds more than V items, O(E log V), a good fit for dense graphs.
+    Disconnected graphs get a spanning forest, with a new tree grown from each
+    node not reached yet
+    Args:
+        graph (FrozenGraph): snapshot of the graph
+        root (int | str | Node): node to grow the first tree from
+        name (str): name of the tree, MST_Prim_<graph name> by default
+    Returns:
+        MSTResult: minimum spanning tree
+    """
+    graph = _undirected(graph)
+    indptr, indices, weights, names = graph.indptr, graph.indices, graph.weights, graph.names
+    in_tree = bytearray(graph.num_nodes)
+    best_edge_from = array("i", [-1]) * graph.num_nodes
+    heap = IndexedMinHeap(graph.num_nodes)
+    push_or_decrease = PROFILER.counting(heap.push_or_decrease, "prim.heap_pushes")
+    result = MSTResult(name or f"MST_Prim_{graph.name}", "prim_eager", num_components=0)
+    roots = [graph.index_of(root)] if graph.num_nodes else []
+    roots.extend(range(graph.num_nodes))
+    for tree_root in roots:
+        if in_tree[tree_root]:
+            continue
+        result.num_components += 1
+        push_or_decrease(tree_root, 0)
+        while heap:
+            current, weight = heap.pop()
+            in_tree[current] = 1
+            if current != tree_root:
+                result.edges.append((names[best_edge_from[current]], names[current], weight))
+                result.total_weight += weight
+            for slot in range(indptr[current], indptr[current + 1]):
+                neighbor = indices[slot]
+                if not in_tree[neighbor] and push_or_decrease(neighbor, weights[slot]):
+                    best_edge_from[neighbor] = current
+    return result
+
+
+def _incidence_lists(num_nodes: int, sources, targets) -> tuple:
+    """
+    Build CSR incidence lists of an undirected edge list, where the slots of node u
+    in (indptr, neighbors, edge_ids) hold each neighbor of u and the id of the edge to it
+    """
+    counts = [0] * (num_nodes + 1)
+    for source, target in zip(sources, targets):
+        counts[source + 1] += 1
+        counts[target + 1] += 1
+    for node_id in range(num_nodes):
+        counts[node_id + 1] += counts[node_id]
+    indptr = array("q", counts)
+    neighbors = array("i", [0]) * counts[-1]
+    edge_ids = array("i", [0]) * counts[-1]
+    for edge_id, (source, target) in enumerate(zip(sources, targets)):
+        neighbors[counts[source]], edge_ids[counts[source]] = target, edge_id
+        counts[source] += 1
+        neighbors[counts[target]], edge_ids[counts[target]] = source, edge_id
+        counts[target] += 1
+    return indptr, neighbors, edge_ids
+
+
+def _bridges(num_nodes: int, indptr, neighbors, edge_ids) -> bytearray:
+    """
+    Find the bridges of an undirected multigraph with an iterative Tarjan search
+    Returns:
+        bytearray: 1 for each edge id that is a bridge
+    """
+    is_bridge = bytearray(len(edge_ids) // 2)
+    discovery = array("i", [-1]) * num_nodes
+    low = array("i", [0]) * num_nodes
+    time = 0
+    for root in range(num_nodes):
+        if discovery[root] >= 0:
+            continue
+        discovery[root] = low[root] = time
+        time += 1
+        # Each stack item is a node, the edge id used to reach it and its next slot
+        stack = [(root, -1, indptr[root])]
+        while stack:
+            node, parent_edge, slot = stack[-1]
+            if slot < indptr[node + 1]:
+                stack[-1] = (node, parent_edge, slot + 1)
+                if edge_ids[slot] == parent_edge:
+                    continue
+                neighbor = neighbors[slot]
+                if discovery[neighbor] < 0:
+                    discovery[neighbor] = low[neighbor] = time
+                    time += 1
+                    stack.append((neighbor, edge_ids[slot], indptr[neighbor]))
+                elif discovery[neighbor] < low[node]:
+                    low[node] = discovery[neighbor]
+                continue
+            stack.pop()
+            if stack:
+                parent = stack[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+                if low[node] > discovery[parent]:
+                    is_bridge[parent_edge] = 1
+    return is_bridge
+
+
+@PROFILER.profiled("mst.reverse_delete")
+def reverse_delete(graph: FrozenGraph, name: str = None) -> MSTResult:
+    """
+    Calculate the minimum spanning tree with the reverse-delete algorithm: take the
+    edges by decreasing weight and remove each one unless that disconnects its nodes.
+    It does not share code with kruskal or the Prim variants, so it can cross-check them.
+
+    The connectivity oracle avoids a full search per edge:
+    - The bridges of the original graph are found once with Tarjan, O(V + E),
+      and are always kept since deleting edges never joins components.
+    - For the rest, two searches run in turns from both nodes of the edge over the
+      edges still alive. They stop when they meet (the edge is deleted) or when one
+      side runs out of nodes (the edge is kept), so a kept edge costs at most twice
+      the size of the smaller side it separates.
+    Directed graphs are treated as undirected
+    Args:
+        graph (FrozenGraph): snapshot of the graph
+        name (str): name of the tree, MST_Reverse_Delete_<graph name> by default
+    Returns:
+        MSTResult: minimum spanning tree
+    """
+    sources, targets, weights = _edge_arrays(graph)
+    num_nodes, names = graph.num_nodes, graph.names
+    indptr, neighbors, edge_ids = _incidence_lists(num_nodes, sources, targets)
+    alive = _bridges(num_nodes, indptr, neighbors, edge_ids)
+    is_bridge = bytes(alive)
+    for edge_id in range(len(alive)):
+        alive[edge_id] = 1
+    # mark[node] holds 2 * query for nodes reached from the first node of the edge
+    # and 2 * query + 1 for the ones reached from the second one, so it is never cleared
+    mark = array("q", [-1]) * num_nodes
+
+    def still_connected(node_a: int, node_b: int, query: int) -> bool:
+        side_marks = (2 * query, 2 * query + 1)
+        mark[node_a], mark[node_b] = side_marks
+        queues = ([node_a], [node_b])
+        heads = [0, 0]
+        side = 0
+        while heads[0] < len(queues[0]) and heads[1] < len(queues[1]):
+            queue = queues[side]
+            node = queue[heads[side]]
+            heads[side] += 1
+            own_mark, other_mark = side_marks[side], side_marks[1 - side]
+            for slot in range(indptr[node], indptr[node + 1]):
+                if not alive[edge_ids[slot]]:
+                    continue
+                neighbor = neighbors[slot]
+                if mark[neighbor] == other_mark:
+                    return True
+                if mark[neighbor] != own_mark:
+                    mark[neighbor] = own_mark
+                    queue.append(neighbor)
+            side = 1 - side
+        return False
+
+    for query, edge_id in enumerate(sorted(range(len(weights)), key=weights.__getitem__, reverse=True)):
+        if is_bridge[edge_id]:
+            continue
+        alive[edge_id] = 0
+        if not still_connected(sources[edge_id], targets[edge_id], query):
+            alive[edge_id] = 1
+
+    result = MSTResult(name or f"MST_Reverse_Delete_{graph.name}", "reverse_delete")
+    for edge_id in range(len(alive)):
+        if alive[edge_id]:
+            result.edges.append((names[sources[edge_id]], names[targets[edge_id]], weights[edge_id]))
+            result.total_weight += weights[edge_id]
+    result.num_components = num_nodes - len(result.edges)
+    return result
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from generators import algorithms, utils
+from models.mesh import MeshGraph
+
+
+def test_mesh_keeps_every_node():
+    for m, n in ((11, 11), (22, 22), (12, 31)):
+        graph = algorithms.mesh_random_graph(m, n, save=False)
+        assert len(graph.nodes) == m * n
+        assert len(graph.edges) == (m - 1) * n + m * (n - 1)
+
+
+def test_mesh_matches_mesh_graph():
+    graph = algorithms.mesh_random_graph(12, 11, save=False)
+    mesh = MeshGraph(12, 11)
+    assert sorted(node.name for node in graph.nodes) == sorted(mesh.names)
+    assert graph.has_edge("N_1_11", "N_2_11")
+
+
+def test_gilbert_rejects_invalid_probability():
+    for p in (-0.1, 1.5):
+        with pytest.raises(ValueError):
+            utils.gilbert_pairs(10, p)
+        with pytest.raises(ValueError):
+            algorithms.gilbert_random_graph(10, p, save=False)
+
+
+def test_gilbert_extreme_probabilities():
+    assert not algorithms.gilbert_random_graph(10, 0, save=False).edges
+    assert len(algorithms.gilbert_random_graph(10, 1, save=False).edges) == 45
+    assert len(algorithms.gilbert_random_graph(10, 1, is_directed=True, save=False).edges) == 90
+
+
+def test_geographical_edges_are_the_close_pairs():
+    random.seed(5)
+    graph = algorithms.geographical_random_graph(400, 0.08, save=False)
+    random.seed(5)
+    x_coords = [random.random() for _ in range(400)]
+    y_coords = [random.random() for _ in range(400)]
+    expected = {(i, j) for i in range(400) for j in range(i + 1, 400)
+                if (x_coords[i] - x_coords[j]) ** 2 + (y_coords[i] - y_coords[j]) ** 2 < 0.08 ** 2}
+    assert len(graph.edges) == len(expected)
+    assert all(graph.has_edge(f"N_{i}", f"N_{j}") for i, j in expected)
+    random.seed(5)
+    directed = algorithms.geographical_random_graph(400, 0.08, is_directed=True, save=False)
+    assert len(directed.edges) == 2 * len(expected)
+
+
+def test_mesh_graph_sizes():
+    assert MeshGraph(1, 1).num_nodes == 1
+    with pytest.raises(ValueError, match="at least 1"):
+        MeshGraph(0, 3)
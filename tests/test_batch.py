@@ -0,0 +1,21 @@
+import json
+
+from generators import batch
+from models.graph import Graph
+from models.mesh import MeshGraph
+
+
+def test_failing_and_empty_jobs_do_not_stop_the_batch(tmp_path, monkeypatch):
+    def fail(graph):
+        raise RuntimeError("broken")
+    monkeypatch.setitem(batch.ALGORITHMS, "fail", (fail, "fail"))
+    manifest_path = tmp_path / "manifest.json"
+    results = batch.run_batch([Graph(name="empty"), MeshGraph(3, 3)], algorithms=("fail", "bfs"), workers=1,
+                              output_folder=str(tmp_path), manifest_path=str(manifest_path))
+    assert len(results) == 4
+    by_job = {(record["graph"], record["algorithm"]): record for record in results}
+    assert by_job[("empty", "bfs")]["skipped"] == "empty graph"
+    assert by_job[("empty", "fail")]["skipped"] == "empty graph"
+    assert by_job[(MeshGraph(3, 3).name, "fail")]["error"] == "RuntimeError: broken"
+    assert by_job[(MeshGraph(3, 3).name, "bfs")]["reached"] == 9
+    assert len(json.load(open(manifest_path))) == 4
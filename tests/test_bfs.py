@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+from generators import algorithms
+from models.mesh import MeshGraph
+
+
+def _graphs():
+    random.seed(3)
+    return [
+        MeshGraph(30, 20),
+        MeshGraph(15, 15, is_directed=True),
+        algorithms.barabasi_albert_graph(2000, 4, save=False).freeze(),
+        algorithms.gilbert_random_graph(500, 0.01, is_directed=True, save=False).freeze(),
+        # Sparse enough to leave nodes unreached
+        algorithms.gilbert_random_graph(800, 0.003, save=False).freeze(),
+    ]
+
+
+@pytest.mark.parametrize("graph", _graphs(), ids=lambda graph: graph.name)
+def test_direction_optimizing_matches_top_down(graph):
+    top_down = graph.bfs(0, direction_optimizing=False)
+    # The default switch, and an alpha that goes bottom-up on every growing level
+    for alpha in (14, 1e9):
+        result = graph.bfs(0, direction_optimizing=True, alpha=alpha)
+        assert list(result.depth) == list(top_down.depth)
+        for node, parent in enumerate(result.parent):
+            if parent >= 0:
+                assert result.depth[parent] == result.depth[node] - 1
@@ -0,0 +1,30 @@
+import os
+
+from generators.cache import ParseCache
+from generators.corpus import parse_to_archive
+from models.dot import write_dot
+from models.mesh import MeshGraph
+
+
+def _entries_size(folder):
+    return sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder) if name.endswith(".glar"))
+
+
+def test_reopened_cache_shrinks_to_a_smaller_limit(tmp_path):
+    folder = str(tmp_path / "cache")
+    files = list()
+    for side in range(2, 8):
+        file_path = str(tmp_path / f"graph_mesh_{side}.dot")
+        write_dot(MeshGraph(side, side), file_path)
+        files.append(file_path)
+    with ParseCache(folder) as cache:
+        for file_path in files:
+            assert cache.get(file_path) is None
+            cache.put(file_path, parse_to_archive(file_path, False))
+    full_size = _entries_size(folder)
+    limit = full_size // 2
+    with ParseCache(folder, max_bytes=limit) as cache:
+        assert _entries_size(folder) <= limit
+        hits = [cache.get(file_path) is not None for file_path in files]
+    assert 0 < hits.count(True) < len(files)
+    assert _entries_size(folder) <= limit
@@ -0,0 +1,44 @@
+import io
+
+from models.dot import parse_dot, write_dot
+
+DOT = b"digraph names {\nalpha -> beta;\na -> b;\nN_0 -> alpha;\n}\n"
+
+
+def test_get_or_create_node_uses_stored_names():
+    from models.graph import Graph
+    graph = Graph()
+    for name in ("N_0", "alpha", "a"):
+        node = graph.get_or_create_node(name)
+        assert node.name == name
+        assert graph.get_node(name) is node
+        assert graph.get_or_create_node(name) is node
+    assert len(graph.nodes) == 3
+
+
+def test_names_without_prefix_round_trip():
+    frozen = parse_dot(DOT).freeze()
+    graph = frozen.to_graph()
+    assert sorted(node.name for node in graph.nodes) == ["N_0", "a", "alpha", "b", "beta"]
+    assert graph.has_edge("alpha", "beta")
+    assert graph.has_edge("a", "b")
+    # Writing and reading the graph again keeps the same names
+    buffer = io.StringIO()
+    write_dot(graph, buffer)
+    again = parse_dot(buffer.getvalue().encode("UTF-8")).to_graph()
+    assert sorted(node.name for node in again.nodes) == sorted(node.name for node in graph.nodes)
+    assert len(again.edges) == len(graph.edges) == 3
+
+
+def test_tree_names_without_prefix():
+    frozen = parse_dot(DOT).freeze()
+    tree = frozen.tree_to_graph(frozen.bfs("N_0").parent, "BFS_names")
+    assert sorted(node.name for node in tree.nodes) == ["N_0", "alpha", "beta"]
+
+
+def test_mst_names_without_prefix():
+    from models import mst
+    frozen = parse_dot(b"graph names {\nalpha -- beta [label=2];\na -- b [label=1];\nbeta -- a [label=3];\n}\n").freeze()
+    tree = mst.kruskal(frozen).to_graph()
+    assert sorted(node.name for node in tree.nodes) == ["a", "alpha", "b", "beta"]
+    assert tree.has_edge("a", "b") and tree.has_edge("alpha", "beta")
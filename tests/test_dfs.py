@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from generators import algorithms
+from models.csr import DFS_POST, DFS_PRE, DFS_RECURSIVE, DFS_STACK, DFS_TREE_EDGE
+from models.graph import Graph
+
+EXPECTED_EVENTS = {
+    DFS_RECURSIVE: [
+        (DFS_PRE, "A", None), (DFS_TREE_EDGE, "A", "B"), (DFS_PRE, "B", "A"),
+        (DFS_TREE_EDGE, "B", "D"), (DFS_PRE, "D", "B"), (DFS_TREE_EDGE, "D", "C"),
+        (DFS_PRE, "C", "D"), (DFS_TREE_EDGE, "C", "F"), (DFS_PRE, "F", "C"),
+        (DFS_POST, "F", "C"), (DFS_POST, "C", "D"), (DFS_TREE_EDGE, "D", "E"),
+        (DFS_PRE, "E", "D"), (DFS_POST, "E", "D"), (DFS_POST, "D", "B"),
+        (DFS_POST, "B", "A"), (DFS_POST, "A", None),
+    ],
+    DFS_STACK: [
+        (DFS_PRE, "A", None), (DFS_TREE_EDGE, "A", "B"), (DFS_TREE_EDGE, "A", "C"),
+        (DFS_PRE, "C", "A"), (DFS_TREE_EDGE, "C", "D"), (DFS_TREE_EDGE, "C", "F"),
+        (DFS_PRE, "F", "C"), (DFS_POST, "F", "C"), (DFS_PRE, "D", "C"),
+        (DFS_TREE_EDGE, "D", "E"), (DFS_PRE, "E", "D"), (DFS_POST, "E", "D"),
+        (DFS_POST, "D", "C"), (DFS_POST, "C", "A"), (DFS_PRE, "B", "A"),
+        (DFS_POST, "B", "A"), (DFS_POST, "A", None),
+    ],
+}
+
+
+def _small_graph():
+    graph = Graph(name="small")
+    for from_label, to_label in (("A", "B"), ("A", "C"), ("B", "D"), ("C", "D"), ("D", "E"), ("C", "F")):
+        graph.add_edge(graph.get_or_create_node(f"N_{from_label}"), graph.get_or_create_node(f"N_{to_label}"))
+    return graph
+
+
+def _baseline_recursive(start):
+    # Tree edges of the recursive get_dfs_recursive that the explicit stack replaced
+    visited, tree = set(), set()
+
+    def visit(node):
+        visited.add(node.name)
+        for edge in node.get_edges():
+            connected_node = edge.get_connected_node(node)
+            if connected_node.name not in visited:
+                tree.add((node.name, connected_node.name))
+                visit(connected_node)
+    visit(start)
+    return tree
+
+
+def _baseline_iterative(start):
+    # Tree edges of the stack based get_dfs_iterative before the CSR rewrite
+    visited, tree = {start.name}, set()
+    stack = [start]
+    while stack:
+        current_node = stack.pop()
+        for edge in current_node.get_edges():
+            connected_node = edge.get_connected_node(current_node)
+            if connected_node.name not in visited:
+                stack.append(connected_node)
+                tree.add((current_node.name, connected_node.name))
+                visited.add(connected_node.name)
+    return tree
+
+
+def _tree_edges(tree):
+    return {(edge.node_from.name, edge.node_to.name) for edge in tree.edges}
+
+
+@pytest.mark.parametrize("order", [DFS_RECURSIVE, DFS_STACK])
+def test_event_order(order):
+    frozen = _small_graph().freeze()
+    events = [(event, frozen.names[node][2:], frozen.names[other][2:] if other >= 0 else None)
+              for event, node, other in frozen.dfs_events(0, order)]
+    assert events == EXPECTED_EVENTS[order]
+
+
+def test_trees_match_the_baseline():
+    random.seed(11)
+    for graph in (_small_graph(), algorithms.gilbert_random_graph(300, 0.02, save=False)):
+        start = graph.get_node(graph.freeze().names[0])
+        assert _tree_edges(graph.get_dfs_recursive()) == _baseline_recursive(start)
+        assert _tree_edges(graph.get_dfs_iterative()) == _baseline_iterative(start)
@@ -0,0 +1,37 @@
+import gzip
+import io
+
+import pytest
+
+from generators.utils import read_graph_from_file
+from models.dot import parse_dot, write_dot
+from models.mesh import MeshGraph
+
+
+def test_compress_to_text_stream_without_buffer():
+    with pytest.raises(ValueError):
+        write_dot(MeshGraph(2, 2), io.StringIO(), compress=True)
+
+
+def test_compress_to_binary_stream():
+    buffer = io.BytesIO()
+    assert write_dot(MeshGraph(2, 2), buffer, compress=True) == 4
+    edges = parse_dot(gzip.decompress(buffer.getvalue()))
+    assert len(edges.sources) == 4
+
+
+def test_empty_content_is_an_empty_graph(tmp_path):
+    for content in (b"", b"  \n\t\n"):
+        edges = parse_dot(content)
+        assert not edges.names and not len(edges.sources)
+    file_path = tmp_path / "graph_empty.dot"
+    file_path.write_bytes(b"")
+    graph = read_graph_from_file(str(file_path))
+    assert graph.name == "graph_empty" and not graph.nodes
+    file_path.write_bytes(b"\n\n")
+    assert not read_graph_from_file(str(file_path)).nodes
+
+
+def test_content_without_header_fails():
+    with pytest.raises(ValueError):
+        parse_dot(b"N_0 -> N_1;\n")
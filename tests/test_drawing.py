@@ -0,0 +1,23 @@
+from generators.drawing import ForceLayout
+from models.graph import Graph, Node
+from models.mesh import MeshGraph
+
+
+def test_small_graph_converges_by_forces():
+    layout = ForceLayout(MeshGraph(3, 3), seed=0).run()
+    assert layout.converged
+    assert layout.mean_force < layout.force_tolerance * layout.edge_length
+
+
+def test_run_stops_when_cooled():
+    layout = ForceLayout(MeshGraph(10, 10), seed=1, force_tolerance=0.0).run(max_iterations=5000)
+    assert layout.cooled and not layout.converged
+    assert layout.step < layout.tolerance * layout.edge_length
+    assert layout.iterations < 5000
+
+
+def test_overlapping_nodes_are_pushed_apart():
+    graph = Graph()
+    graph.add_edge(Node("A"), Node("B"))
+    layout = ForceLayout(graph, positions=([0.0, 0.0], [0.0, 0.0])).run()
+    assert (layout.x[0], layout.y[0]) != (layout.x[1], layout.y[1])
@@ -0,0 +1,14 @@
+from models.graph import Graph, Node
+
+
+def test_add_validated_edge_skips_repeated_edges():
+    graph = Graph()
+    node_a, node_b = Node("A"), Node("B")
+    graph.add_validated_edge(node_a, node_b, 3)
+    graph.add_validated_edge(Node("B"), Node("A"), 5)
+    assert len(graph.edges) == 1
+    assert graph.get_edge("N_A", "N_B").weigth == 3
+    graph.remove_edge("N_A", "N_B")
+    assert not graph.edges
+    assert not graph.has_edge("N_A", "N_B")
+    assert not graph.get_node("N_A").get_edges()
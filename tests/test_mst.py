@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from generators import algorithms
+from models import mst
+
+ALGORITHMS = (mst.kruskal, mst.prim_lazy, mst.prim_eager, mst.reverse_delete)
+
+
+def _weighted_gilbert(n, p, seed):
+    random.seed(seed)
+    graph = algorithms.gilbert_random_graph(n, p, save=False)
+    for edge in graph.edges:
+        edge.weigth = random.randint(1, 100)
+    return graph.freeze()
+
+
+def _check_forest(frozen, result):
+    # The edges join all the nodes of each component without cycles
+    components = mst.DisjointSet(frozen.num_nodes)
+    for from_name, to_name, _ in result.edges:
+        assert components.union(frozen.index_of(from_name), frozen.index_of(to_name))
+    assert len(result.edges) == frozen.num_nodes - result.num_components
+    assert result.total_weight == sum(weight for _, _, weight in result.edges)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_connected_graphs_agree(seed):
+    frozen = _weighted_gilbert(60, 0.2, seed)
+    results = [algorithm(frozen) for algorithm in ALGORITHMS]
+    for result in results:
+        _check_forest(frozen, result)
+        assert result.num_components == 1
+        assert len(result.edges) == frozen.num_nodes - 1
+    assert len({result.total_weight for result in results}) == 1
+
+
+def test_disconnected_graph_agrees():
+    # With p = 0.02 the 80 nodes are far from connected
+    frozen = _weighted_gilbert(80, 0.02, 7)
+    results = [algorithm(frozen) for algorithm in ALGORITHMS]
+    assert results[0].num_components > 1
+    for result in results:
+        _check_forest(frozen, result)
+    assert len({result.total_weight for result in results}) == 1
+    assert len({result.num_components for result in results}) == 1